@@ -0,0 +1,494 @@
+import logging
+import math
+import sys
+import threading
+import time
+
+import numpy as np
+
+from MCTS import MCTS, EPS, EVICTION_KEEP, MIN_SIMS, WIN, LOSS, DRAW, PROVEN_VALUES, proven_result
+from inference_queue import InferenceQueue
+
+log = logging.getLogger(__name__)
+
+NODE_CHUNK = 1024  # nodes added to the arrays each time they are full
+EDGE_CHUNK = 16 * NODE_CHUNK
+
+EVICTION_ROUND_SIMS = 64  # args.numThreads and args.maxNodes: simulations of the threads between two evict()
+
+# (name, dtype, fill value) of the node arrays, indexed by node
+NODE_ARRAYS = [
+    ('Ns', np.int64, 0),  # #times node was visited
+    ('Es', float, 0),  # game.getGameEnded of node
+    ('edge_start', np.int64, -1),  # first edge, -1 if not expanded
+    ('edge_count', np.int64, 0),  # number of legal actions
+    ('virtual_Ns', np.int64, 0),  # pending batched paths through node
+    ('last_visit', np.int64, 0),  # last simulation that visited node (args.maxNodes)
+    ('proven', np.int8, 0),  # proven result (WIN, LOSS, DRAW) of node, always set if terminal, 0 if unproven
+]
+# (name, dtype, fill value) of the edge arrays, indexed by edge
+EDGE_ARRAYS = [
+    ('actions', np.int64, 0),  # action a of edge
+    ('Ps', float, 0),  # prior of edge
+    ('Nsa', np.int64, 0),  # #times edge was visited
+    ('Qsa', float, 0),  # Q value of edge
+    ('children', np.int64, -1),  # child node, -1 if not visited
+    ('virtual_Nsa', np.int64, 0),  # virtual losses of edge
+]
+
+
+class ArrayMCTS(MCTS):
+    """
+    The same search as MCTS (same selections, same visit counts), but the tree
+    is kept in preallocated numpy arrays instead of the Qsa, Nsa, Ns, Ps, Es, Vs
+    dictionaries:
+        a node is an int index into the node arrays (NODE_ARRAYS), found from
+        its key (MCTS.getKey()) with a single dict lookup,
+        an edge is an int index into the edge arrays (EDGE_ARRAYS), the edges
+        of a node are its legal actions only, stored contiguously from
+        edge_start[node].
+
+    The arrays grow by chunks (NODE_CHUNK, EDGE_CHUNK) when they are full.
+    """
+
+    def __init__(self, game, nnet, args):
+        super().__init__(game, nnet, args)  # only Ks and clock of MCTS are used
+        self.nodes = {}  # key s -> node
+        self.node_keys = []  # node -> key s
+        self.root = None  # GameState of the root, args.reuseSubtree only
+
+        self.num_nodes = 0
+        self.num_edges = 0
+        for name, dtype, fill_value in NODE_ARRAYS:
+            setattr(self, name, np.full(NODE_CHUNK, fill_value, dtype=dtype))
+        for name, dtype, fill_value in EDGE_ARRAYS:
+            setattr(self, name, np.full(EDGE_CHUNK, fill_value, dtype=dtype))
+
+    def _grow(self, arrays, size):
+        """reallocate arrays (NODE_ARRAYS or EDGE_ARRAYS) to size entries"""
+        for name, dtype, fill_value in arrays:
+            array = getattr(self, name)
+            grown = np.full(size, fill_value, dtype=dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def newNode(self, game_ended):
+        if self.num_nodes == len(self.Ns):
+            self._grow(NODE_ARRAYS, len(self.Ns) + NODE_CHUNK)
+
+        node = self.num_nodes
+        self.num_nodes += 1
+        self.Es[node] = game_ended
+        if game_ended != 0:
+            self.proven[node] = proven_result(game_ended)
+        return node
+
+    def newEdges(self, actions, priors):
+        """
+        Returns:
+            start: the first of the len(actions) new edges
+        """
+        n = len(actions)
+        if self.num_edges + n > len(self.actions):
+            self._grow(EDGE_ARRAYS, len(self.actions) + max(EDGE_CHUNK, n))
+
+        start = self.num_edges
+        self.num_edges += n
+        self.actions[start:start + n] = actions
+        self.Ps[start:start + n] = priors
+        return start
+
+    def getNode(self, state):
+        """
+        Returns:
+            node: the node of state, a new one if state was never reached
+            symmetry: as MCTS.getKey()
+        """
+        s, symmetry = self.getKey(state)
+        node = self.nodes.get(s)
+        if node is None:
+            node = self.nodes[s] = self.newNode(state.game_ended)
+            self.node_keys.append(s)
+        return node, symmetry
+
+    def getCounts(self, state):
+        node, symmetry = self.getNode(state)
+        counts = np.zeros(self.game.getActionSize(), dtype=np.int64)
+        start, end = self.edge_start[node], self.edge_start[node] + self.edge_count[node]
+        if start >= 0:
+            counts[self.actions[start:end]] = self.Nsa[start:end]
+        if symmetry is not None:
+            counts = counts[np.argsort(symmetry)]
+        return counts.tolist()
+
+    def expand(self, node, state, symmetry, prediction=None):
+        """
+        Adds the edges of node, with the priors of the network.
+
+        prediction: nnet.predict() of state, if it was already made (batched)
+
+        Returns:
+            v: the value of state from the network
+        """
+        valids = state.valid_moves
+        if prediction is None:
+            prediction = self.nnet.predict(state.board, state.mask_2d)
+        ps, v = prediction
+        if symmetry is not None:
+            ps, valids = ps[symmetry], valids[symmetry]
+        ps = ps * valids.astype(float)  # masking invalid moves (valids are int8)
+        sum_ps = np.sum(ps)
+        if sum_ps > 0:
+            ps /= sum_ps  # renormalize
+        else:
+            # see MCTS.expand()
+            log.error("All valid moves were masked, doing a workaround.")
+            ps = ps + valids
+            ps /= np.sum(ps)
+
+        actions = np.flatnonzero(valids)
+        self.edge_start[node] = self.newEdges(actions, ps[actions])
+        self.edge_count[node] = len(actions)
+        self.Ns[node] = 0
+        return np.asarray(v, dtype=float).item()
+
+    def selectEdge(self, node):
+        """
+        Returns:
+            edge: the edge of node with the highest upper confidence bound (the
+                  first one on ties), computed for all the edges at once
+        """
+        start = self.edge_start[node]
+        end = start + self.edge_count[node]
+        Ns, Nsa, Qsa, Ps = self.Ns[node], self.Nsa[start:end], self.Qsa[start:end], self.Ps[start:end]
+        if self.virtual_Ns[node] > 0:
+            # each pending batched path counts as a visit that lost
+            virtual_Nsa = self.virtual_Nsa[start:end]
+            Qsa = np.where(virtual_Nsa > 0, (Nsa * Qsa - virtual_Nsa) / np.maximum(Nsa + virtual_Nsa, 1), Qsa)
+            Nsa = Nsa + virtual_Nsa
+            Ns = Ns + self.virtual_Ns[node]
+
+        u = np.where(Nsa > 0,
+                     Qsa + self.args.cpuct * Ps * np.sqrt(Ns) / (1 + Nsa),
+                     self.args.cpuct * Ps * np.sqrt(Ns + EPS))  # Q = 0 ?
+        if self.args.get('mctsSolver', False):
+            # the proven children are not selected, unless all are (see MCTS.selectAction())
+            children = self.children[start:end]
+            u = np.where((children >= 0) & (self.proven[children] != 0), -np.inf, u)
+        return start + np.argmax(u)
+
+    def setRoot(self, state):
+        """
+        args.reuseSubtree: makes state the root of the tree, its subtree (the
+        nodes reachable from its node) is kept with all its statistics and the
+        rest of the tree is released
+        """
+        s, _ = self.getKey(state)
+        if self.root is None or s != self.getKey(self.root)[0]:
+            self.keepSubtree(self.nodes.get(s))
+        self.root = state
+
+    def advanceRoot(self, action):
+        """setRoot() to the child of the root after action (on the board of the root)"""
+        self.setRoot(self.game.getCanonicalGameState(self.game.getNextGameState(self.root, action)))
+
+    def keepSubtree(self, node):
+        """
+        Keeps node and the nodes reachable from it only (nothing if node is
+        None), node becomes 0, see _compact().
+        """
+        keep = [] if node is None else [node]
+        kept = set(keep)
+        for node in keep:  # keep grows while it is read
+            start = self.edge_start[node]
+            if start >= 0:
+                for child in self.children[start:start + self.edge_count[node]].tolist():
+                    if child >= 0 and child not in kept:
+                        kept.add(child)
+                        keep.append(child)
+        log.debug(f'Keeping {len(keep)} of {self.num_nodes} nodes')
+        self._compact(np.array(keep, dtype=np.int64))
+
+    def evict(self):
+        """as MCTS.evict(), the evicted nodes are cut from their parents, whose edges keep their statistics"""
+        max_nodes = self.args.get('maxNodes', None)
+        if not max_nodes or self.num_nodes <= max_nodes:
+            return
+
+        by_last_visit = np.argsort(-self.last_visit[:self.num_nodes], kind='stable')
+        num_nodes = self.num_nodes
+        self._compact(np.sort(by_last_visit[:int(EVICTION_KEEP * max_nodes)]))
+        log.debug(f'Evicted {num_nodes - self.num_nodes} nodes, {self.getTreeSize()}')
+
+    def _compact(self, keep):
+        """
+        Keeps the nodes of keep only (and their edges), keep[i] becomes the
+        node i, the arrays are reallocated to fit. The children that are not
+        kept become -1.
+        """
+        new_nodes = np.full(self.num_nodes, -1, dtype=np.int64)
+        new_nodes[keep] = np.arange(len(keep))
+        edge_counts = np.where(self.edge_start[keep] >= 0, self.edge_count[keep], 0)
+        new_edge_start = np.cumsum(edge_counts) - edge_counts
+        edges = np.repeat(self.edge_start[keep] - new_edge_start, edge_counts) + np.arange(edge_counts.sum())
+
+        for arrays, indices, chunk in [(NODE_ARRAYS, keep, NODE_CHUNK), (EDGE_ARRAYS, edges, EDGE_CHUNK)]:
+            for name, dtype, fill_value in arrays:
+                array = np.full((len(indices) // chunk + 1) * chunk, fill_value, dtype=dtype)
+                array[:len(indices)] = getattr(self, name)[indices]
+                setattr(self, name, array)
+        self.edge_start[:len(keep)] = np.where(self.edge_start[:len(keep)] >= 0, new_edge_start, -1)
+        children = self.children[:len(edges)]
+        self.children[:len(edges)] = np.where(children >= 0, new_nodes[children], -1)
+
+        self.node_keys = [self.node_keys[node] for node in keep.tolist()]
+        self.nodes = {s: node for node, s in enumerate(self.node_keys)}
+        self.num_nodes, self.num_edges = len(keep), len(edges)
+
+    def getTreeSize(self):
+        """as MCTS.getTreeSize(), the bytes are those of the arrays and of the node keys dict"""
+        num_bytes = sum(getattr(self, name).nbytes for name, _, _ in NODE_ARRAYS + EDGE_ARRAYS) \
+            + sys.getsizeof(self.nodes) + sys.getsizeof(self.node_keys)
+        return {'nodes': self.num_nodes, 'edges': self.num_edges, 'bytes': num_bytes}
+
+    def isProven(self, state):
+        if not self.args.get('mctsSolver', False):
+            return False
+        node = self.nodes.get(self.getKey(state)[0])
+        return node is not None and self.proven[node] != 0
+
+    def getProvenMoves(self, state):
+        node = self.nodes.get(self.getKey(state)[0])
+        if node is None or not self.args.get('mctsSolver', False) or self.proven[node] not in (WIN, DRAW):
+            return []
+        child_result = LOSS if self.proven[node] == WIN else DRAW
+        start = self.edge_start[node]
+        children = self.children[start:start + self.edge_count[node]]
+        actions = self.actions[start:start + self.edge_count[node]][
+            (children >= 0) & (self.proven[children] == child_result)]
+        _, symmetry = self.getKey(state)
+        return actions.tolist() if symmetry is None else symmetry[actions].tolist()
+
+    def provenValue(self, node):
+        """the value of a terminal or proven node for its player"""
+        if self.Es[node] != 0:
+            return self.Es[node]
+        return PROVEN_VALUES[int(self.proven[node])]
+
+    def solve(self, path):
+        """as MCTS.solve(), on the node arrays"""
+        for node, edge in reversed(path):
+            child_result = self.proven[self.children[edge]]
+            if child_result == 0:
+                return
+            if child_result == LOSS:
+                self.proven[node] = WIN
+                continue
+            start = self.edge_start[node]
+            children = self.children[start:start + self.edge_count[node]]
+            results = np.where(children >= 0, self.proven[children], 0)
+            if np.any(results == LOSS):
+                # another child was proven lost through another parent (transposition)
+                self.proven[node] = WIN
+            elif np.any(results == 0):
+                return
+            else:
+                self.proven[node] = DRAW if np.any(results == DRAW) else LOSS
+
+    def searchState(self, state):
+        """as MCTS.searchState(), the path is a list of (node, edge) pairs"""
+        path, node, state, symmetry = self.descend(state)
+        if self.proven[node] != 0:
+            # terminal or proven node
+            return self.backup(path, -self.provenValue(node))
+
+        # leaf node
+        return self.backup(path, -self.expand(node, state, symmetry))
+
+    def descend(self, state):
+        """
+        Returns:
+            path: the (node, edge) pairs from state to a terminal, proven or leaf node
+            node, state, symmetry: of this terminal, proven or leaf node
+        """
+        path = []
+        self.clock += 1
+        node, symmetry = self.getNode(state)
+        self.last_visit[node] = self.clock
+
+        while self.proven[node] == 0 and self.edge_start[node] >= 0:
+            edge = self.selectEdge(node)
+            path.append((node, edge))
+            a = self.actions[edge]
+            # the action played on the board of state
+            move = a if symmetry is None else symmetry[a]
+            state = self.game.getCanonicalGameState(self.game.getNextGameState(state, move))
+            node, symmetry = self.getNode(state)
+            self.children[edge] = node
+            self.last_visit[node] = self.clock
+
+        return path, node, state, symmetry
+
+    def backup(self, path, v):
+        """
+        Updates the edges of path from the leaf up, v is the value of the leaf
+        for the player of the last node of path, then solve() with
+        args.mctsSolver.
+
+        Returns:
+            v: the negative of the value of the first node of path
+        """
+        for node, edge in reversed(path):
+            if self.Nsa[edge] > 0:
+                self.Qsa[edge] = (self.Nsa[edge] * self.Qsa[edge] + v) / (self.Nsa[edge] + 1)
+            else:
+                self.Qsa[edge] = v
+            self.Nsa[edge] += 1
+
+            self.Ns[node] += 1
+            v = -v
+
+        if self.args.get('mctsSolver', False):
+            self.solve(path)
+        return v
+
+    def addVirtualLoss(self, path, n):
+        for node, edge in path:
+            self.virtual_Ns[node] += n
+            self.virtual_Nsa[edge] += n
+
+    def startSearch(self, state):
+        """setRoot(state) if args.reuseSubtree, then MCTS.startSearch()"""
+        if self.args.get('reuseSubtree', False):
+            self.setRoot(state)
+        super().startSearch(state)
+
+    def searchUntil(self, state, num_sims, deadline):
+        """
+        as MCTS.searchUntil(), by searchParallel() if args.numThreads > 1,
+        or by rounds of searchBatch() if args.leafBatchSize > 1
+
+        evict() renumbers the nodes, so it is only called between rounds, when
+        no path is pending: after each batch, and with args.maxNodes, the
+        threads search by rounds of EVICTION_ROUND_SIMS simulations.
+        """
+        num_threads = self.args.get('numThreads', 1)
+        if num_threads > 1 and not self.args.get('maxNodes', None):
+            return self.searchParallel(state, num_sims, deadline)
+
+        batch_size = self.args.get('leafBatchSize', 1)
+        if num_threads <= 1 and batch_size <= 1:
+            return super().searchUntil(state, num_sims, deadline)
+
+        n = 0
+        while n < num_sims and (n < MIN_SIMS or time.time() < deadline) and not self.isProven(state):
+            if num_threads > 1:
+                n += self.searchParallel(state, min(EVICTION_ROUND_SIMS, num_sims - n), deadline)
+            else:
+                n += self.searchBatch(state, math.ceil(min(batch_size, num_sims - n)))
+            self.evict()
+        return n
+
+    def searchBatch(self, state, batch_size):
+        """
+        Up to batch_size simulations from state, the leaves are evaluated by a
+        single nnet.predictBatch().
+
+        The paths are descended one after the other, each with a virtual loss
+        on its edges until it is backed up, so that the next ones go elsewhere.
+        A path to a terminal node is backed up at once, a path to a leaf that
+        is already in the batch ends the round.
+
+        Returns:
+            n: the number of simulations done, at least 1
+        """
+        n = 0
+        batch, batch_nodes = [], set()  # (path, node, state, symmetry) of the leaves
+        for _ in range(batch_size):
+            path, node, leaf_state, symmetry = self.descend(state)
+            if self.proven[node] != 0:
+                # terminal or proven node
+                self.backup(path, -self.provenValue(node))
+                n += 1
+                if not path:
+                    break  # state is proven
+                continue
+            if node in batch_nodes:
+                break
+
+            self.addVirtualLoss(path, 1)
+            batch.append((path, node, leaf_state, symmetry))
+            batch_nodes.add(node)
+
+        if batch:
+            pis, vs = self.nnet.predictBatch([leaf_state.board for _, _, leaf_state, _ in batch],
+                                             [leaf_state.mask_2d for _, _, leaf_state, _ in batch])
+            for (path, node, leaf_state, symmetry), pi, v in zip(batch, pis, vs):
+                self.addVirtualLoss(path, -1)
+                self.backup(path, -self.expand(node, leaf_state, symmetry, (pi, v)))
+        return n + len(batch)
+
+    def searchParallel(self, state, num_sims, deadline=math.inf):
+        """
+        num_sims simulations (or until deadline, see MCTS.searchUntil()) from
+        state by args.numThreads worker threads on the
+        same tree. The tree is only read and changed under a lock (the tree work
+        is serialized by the GIL anyway), each worker keeps a virtual loss on its
+        path while its leaf is evaluated outside the lock, through a shared
+        InferenceQueue that batches the leaves of all the workers.
+        """
+        num_threads = self.args.numThreads
+        lock = threading.Lock()
+        pending_nodes = set()  # leaves being evaluated
+        started = [0]
+        errors = []
+
+        def work(inference_queue):
+            try:
+                while True:
+                    with lock:
+                        if started[0] >= num_sims or (started[0] >= MIN_SIMS and time.time() >= deadline) \
+                                or self.isProven(state):
+                            return
+                        path, node, leaf_state, symmetry = self.descend(state)
+                        if self.proven[node] != 0:
+                            # terminal or proven node
+                            self.backup(path, -self.provenValue(node))
+                            started[0] += 1
+                            continue
+                        collision = node in pending_nodes
+                        if not collision:
+                            self.addVirtualLoss(path, 1)
+                            pending_nodes.add(node)
+                            started[0] += 1
+                    if collision:
+                        # another worker is evaluating this leaf
+                        time.sleep(0)
+                        continue
+
+                    prediction = inference_queue.predict(leaf_state.board, leaf_state.mask_2d)
+                    with lock:
+                        self.addVirtualLoss(path, -1)
+                        self.backup(path, -self.expand(node, leaf_state, symmetry, prediction))
+                        pending_nodes.discard(node)
+            except Exception as e:
+                errors.append(e)
+
+        with InferenceQueue(self.nnet, num_threads) as inference_queue:
+            workers = [threading.Thread(target=work, args=(inference_queue, )) for _ in range(num_threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        if errors:
+            raise errors[0]
+        log.debug(f'{started[0]} simulations by {num_threads} threads, '
+                  f'{inference_queue.num_predictions} evaluations in {inference_queue.num_batches} batches')
+        return started[0]
+
+
+def createMCTS(game, nnet, args):
+    """MCTS, or ArrayMCTS if args.arrayTree"""
+    if args.get('arrayTree', False):
+        return ArrayMCTS(game, nnet, args)
+    return MCTS(game, nnet, args)
@@ -9,7 +9,7 @@ import numpy as np
 from tqdm import tqdm
 
 from Arena import Arena
-from MCTS import MCTS
+from ArrayMCTS import createMCTS
 
 log = logging.getLogger(__name__)
 
@@ -25,7 +25,7 @@ class Coach():
         self.nnet = nnet
         self.pnet = self.nnet.__class__(self.game)  # the competitor network
         self.args = args
-        self.mcts = MCTS(self.game, self.nnet, self.args)
+        self.mcts = createMCTS(self.game, self.nnet, self.args)
         self.trainExamplesHistory = []  # history of examples from args.numItersForTrainExamplesHistory latest iterations
         self.skipFirstSelfPlay = False  # can be overriden in loadTrainExamples()
 
@@ -57,11 +57,11 @@ class Coach():
             temp = int(episodeStep < self.args.tempThreshold)
 
             pi = self.mcts.getActionProb(canonicalBoard, curr_area, temp=temp)
-            sym = self.game.getSymmetries(canonicalBoard, pi, curr_area)
-            for b, p, curr_area_ in sym:
+            boards, pis, curr_areas, masks = self.game.getSymmetriesBatch(canonicalBoard, pi, curr_area)
+            for b, p, curr_area_, mask_2d in zip(boards, pis, curr_areas, masks):
                 trainExamples.append([b, self.curPlayer, p, None,
                                       curr_area_,
-                                      self.game.get_mask_2d(b, p, curr_area_)])
+                                      mask_2d])
 
             action = np.random.choice(len(pi), p=pi)
             board, self.curPlayer, curr_area = self.game.getNextState(board, self.curPlayer, action, curr_area)
@@ -91,8 +91,9 @@ class Coach():
                 print("Self Play.....")
                 print(f'self.args.numEps={self.args.numEps}')
                 for _ in range(self.args.numEps):
-                    self.mcts = MCTS(self.game, self.nnet, self.args)  # reset search tree
+                    self.mcts = createMCTS(self.game, self.nnet, self.args)  # reset search tree
                     iterationTrainExamples += self.executeEpisode()
+                self.logCacheStats('Self play', self.nnet)
 
                 # save the iteration examples to the history 
                 self.trainExamplesHistory.append(iterationTrainExamples)
@@ -114,16 +115,18 @@ class Coach():
             # training new network, keeping a copy of the old one
             self.nnet.save_checkpoint(folder=self.args.checkpoint, filename='temp.pth.tar')
             self.pnet.load_checkpoint(folder=self.args.checkpoint, filename='temp.pth.tar')
-            pmcts = MCTS(self.game, self.pnet, self.args)
+            pmcts = createMCTS(self.game, self.pnet, self.args)
 
             self.nnet.train(trainExamples)
-            nmcts = MCTS(self.game, self.nnet, self.args)
+            nmcts = createMCTS(self.game, self.nnet, self.args)
 
             log.info('PITTING AGAINST PREVIOUS VERSION')
             arena = Arena(lambda x, y_curr_area: np.argmax(pmcts.getActionProb(x, y_curr_area, temp=0)),
                           lambda x, y_curr_area: np.argmax(nmcts.getActionProb(x, y_curr_area, temp=0)), self.game)
             pwins, nwins, draws = arena.playGames(self.args.arenaCompare)
 
+            self.logCacheStats('Arena, previous network', self.pnet)
+            self.logCacheStats('Arena, new network', self.nnet)
             log.info('NEW/PREV WINS : %d / %d ; DRAWS : %d' % (nwins, pwins, draws))
             if pwins + nwins == 0 or float(nwins) / (pwins + nwins) < self.args.updateThreshold:
                 log.info('REJECTING NEW MODEL')
@@ -133,6 +136,12 @@ class Coach():
                 self.nnet.save_checkpoint(folder=self.args.checkpoint, filename=self.getCheckpointFile(i))
                 self.nnet.save_checkpoint(folder=self.args.checkpoint, filename='best.pth.tar')
 
+    def logCacheStats(self, stage, nnet):
+        """logs the hit rate of the evaluation cache of nnet, if it has one (NNetWrapper)"""
+        cache = getattr(nnet, 'cache', None)
+        if cache is not None:
+            log.info(f'{stage}: evaluation cache {cache.getStats()}')
+
     def getCheckpointFile(self, iteration):
         return 'checkpoint_' + str(iteration) + '.pth.tar'
 
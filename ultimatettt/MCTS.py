@@ -1,13 +1,43 @@
 import logging
 import math
+import sys
+import time
 
 import numpy as np
 
+from endgame_solver import EndgameSolver
+
 EPS = 1e-8
+EVICTION_KEEP = 0.75  # fraction of args.maxNodes left by an eviction
+
+MIN_SIMS = 2  # simulations of a search at least, the first one may only expand the root
+
+# args.adaptiveSims
+SINGLE_AREA_FACTOR = 0.5  # budget factor when all the legal moves are in one area
+SETTLED_RATIO = 2  # the visits are settled when the best action has SETTLED_RATIO x the second
+EXTENSION_STEPS = 4  # an unsettled search gets up to EXTENSION_STEPS extra quarters of its budget
+
+PONDER_SIMS = 8  # simulations between two checks of the stop event of ponder()
+PONDER_MAX_VISITS = 10000  # default args.ponderMaxVisits, the root visits where ponder() stops
+
+EARLY_STOP_STEP = 8  # args.earlyStop: simulations (x batch size or threads) between two checks of the visits
+
+# args.mctsSolver: the proven results of boards, for their player to move
+WIN, LOSS, DRAW = 1, -1, 2
+PROVEN_VALUES = {WIN: 1, LOSS: -1, DRAW: 0}
 
 log = logging.getLogger(__name__)
 
 
+def proven_result(game_ended):
+    """the proven result (WIN, LOSS or DRAW) of a terminal board, from its game ended"""
+    if game_ended == 1:
+        return WIN
+    if game_ended == -1:
+        return LOSS
+    return DRAW
+
+
 class MCTS():
     """
     This class handles the MCTS tree.
@@ -17,13 +47,27 @@ class MCTS():
         self.game = game
         self.nnet = nnet
         self.args = args
-        self.Qsa = {}  # stores Q values for s,a (as defined in the paper)
-        self.Nsa = {}  # stores #times edge s,a was visited
+        self.Qsa = {}  # stores Q values for s,a (as defined in the paper), Qsa[s][a] in an array per board s
+        self.Nsa = {}  # stores #times edge s,a was visited, Nsa[s][a] in an array per board s
         self.Ns = {}  # stores #times board s was visited
         self.Ps = {}  # stores initial policy (returned by neural net)
 
         self.Es = {}  # stores game.getGameEnded ended for board s
-        self.Vs = {}  # stores game.getValidMoves for board s
+        self.Vs = {}  # stores game.getValidMoves for board s (int8)
+        self.Ts = {}  # stores the last simulation that visited board s (args.maxNodes)
+
+        self.Ss = {}  # stores the proven result (WIN, LOSS, DRAW) of board s (args.mctsSolver)
+        self.Cs = {}  # stores the child board of s,a (args.mctsSolver)
+
+        self.clock = 0  # number of simulations so far
+        self.game_time = 0  # seconds spent searching in the current game (args.gameTimeMs)
+        self.game_played_cells = 0  # played cells at the last search, to detect a new game
+        self.last_search = {}  # simulations, seconds and simulations saved (args.earlyStop) of the last getActionProb()
+        self.last_ponder = {}  # simulations and seconds of the last ponder()
+
+        self.Ks = {}  # stores game.stringRepresentation for board s (args.zobristDebug only)
+
+        self.endgame_solver = EndgameSolver(game, nnet, args)  # exact play below args.endgameCells
 
     def getActionProb(self, canonicalBoard, curr_area, temp=1):
         """
@@ -32,13 +76,24 @@ class MCTS():
 
         Returns:
             probs: a policy vector where the probability of the ith action is
-                   proportional to Nsa[(s,a)]**(1./temp)
+                   proportional to Nsa[s][a]**(1./temp), or uniform over the
+                   moves that keep the result if the board is proven won or
+                   drawn (args.mctsSolver), or solved as won or drawn by the
+                   endgame solver, without simulations (args.endgameCells)
         """
-        for i in range(self.args.numMCTSSims):
-            self.search(canonicalBoard, curr_area)
+        state = self.game.getGameState(canonicalBoard, 1, curr_area)
+        value, solved_moves = self.endgame_solver.solve(state)
+        if value is not None and value >= 0:
+            self.last_search = {'sims': 0, 'seconds': self.endgame_solver.last_solve['seconds'], 'saved': 0}
+            return self.getMovesProb(solved_moves, temp)
+
+        self.runSimulations(state, temp)
 
-        s = self.game.stringRepresentation(canonicalBoard, curr_area)
-        counts = [self.Nsa[(s, a)] if (s, a) in self.Nsa else 0 for a in range(self.game.getActionSize())]
+        proven_moves = self.getProvenMoves(state)
+        if proven_moves:
+            return self.getMovesProb(proven_moves, temp)
+
+        counts = self.getCounts(state)
 
         if temp == 0:
             bestAs = np.array(np.argwhere(counts == np.max(counts))).flatten()
@@ -52,86 +107,431 @@ class MCTS():
         probs = [x / counts_sum for x in counts]
         return probs
 
+    def getMovesProb(self, moves, temp):
+        """
+        Returns:
+            probs: a policy vector over moves, uniform, or on one of them at
+                   random if temp == 0
+        """
+        probs = [0] * self.game.getActionSize()
+        if temp == 0:
+            probs[np.random.choice(moves)] = 1
+        else:
+            for move in moves:
+                probs[move] = 1 / len(moves)
+        return probs
+
+    def runSimulations(self, state, temp=1):
+        """
+        The simulations of getActionProb() from state, after startSearch():
+            numMCTSSims simulations, or until the time budget of the move is
+            spent with args.moveTimeMs or args.gameTimeMs (see getBudget()),
+            with args.adaptiveSims, less on forced moves and moves in a single
+            area, and up to twice the budget while the visits are not settled,
+            with args.mctsSolver, none once the board is proven,
+            with args.earlyStop and temp == 0, none once the most visited
+            action cannot change within the simulations left (see isDecided()).
+        """
+        self.startSearch(state)
+        start = time.time()
+        num_sims, seconds = self.getBudget(state)
+        deadline = start + seconds
+        adaptive = self.args.get('adaptiveSims', False)
+        # the simulations left are only known for a budget of simulations
+        early_stop = temp == 0 and self.args.get('earlyStop', False) and math.isfinite(num_sims)
+        max_sims = 2 * num_sims if adaptive else num_sims  # with the extensions of adaptiveSims
+
+        n = self.searchUntilDecided(state, num_sims, deadline, max_sims if early_stop else None)
+        if adaptive:
+            for step in range(1, EXTENSION_STEPS + 1):
+                if self.isSettled(state) or (early_stop and self.isDecided(state, max_sims - n)):
+                    break
+                extension = 1 + step / EXTENSION_STEPS
+                n += self.searchUntilDecided(state, num_sims * extension - n, start + seconds * extension,
+                                             max_sims - n if early_stop else None)
+
+        elapsed = time.time() - start
+        self.game_time += elapsed
+        saved = max_sims - n if early_stop and self.isDecided(state, max_sims - n) else 0
+        self.last_search = {'sims': n, 'seconds': elapsed, 'saved': saved}
+        if saved:
+            log.debug(f'Early stop: {n} simulations, {saved} saved')
+
+    def startSearch(self, state):
+        """called before searching from state, evict()"""
+        self.evict()
+
+    def ponder(self, canonicalBoard, curr_area, stop):
+        """
+        Simulations from canonicalBoard until stop (a threading.Event) is set,
+        run in a background thread by Ponderer while the opponent thinks on
+        canonicalBoard, the tree is then reused by the next getActionProb().
+
+        The tree grows with the time the opponent takes, so pondering also
+        stops once canonicalBoard has args.ponderMaxVisits root visits (over
+        all the ponder() calls on it).
+        """
+        state = self.game.getGameState(canonicalBoard, 1, curr_area)
+        self.startSearch(state)
+        start = time.time()
+        max_visits = self.args.get('ponderMaxVisits', PONDER_MAX_VISITS)
+        n = 0
+        while not stop.is_set() and not self.isProven(state) and sum(self.getCounts(state)) < max_visits:
+            n += self.searchUntil(state, PONDER_SIMS, math.inf)
+        self.last_ponder = {'sims': n, 'seconds': time.time() - start}
+
+    def searchUntil(self, state, num_sims, deadline):
+        """
+        Simulations from state, until num_sims are done or time.time() passes
+        deadline (but at least MIN_SIMS), or state is proven (args.mctsSolver).
+        The tree is kept within args.maxNodes between the simulations, see
+        evict(), as a search with a time budget has no bound on its simulations.
+
+        Returns:
+            n: the number of simulations done
+        """
+        n = 0
+        while n < num_sims and (n < MIN_SIMS or time.time() < deadline) and not self.isProven(state):
+            self.searchState(state)
+            self.evict()
+            n += 1
+        return n
+
+    def searchUntilDecided(self, state, num_sims, deadline, max_sims=None):
+        """
+        searchUntil(), by steps of EARLY_STOP_STEP simulations if max_sims is
+        not None, then it stops as soon as the most visited action of state is
+        decided with the max_sims - n simulations left (see isDecided()).
+
+        Returns:
+            n: the number of simulations done
+        """
+        if max_sims is None:
+            return self.searchUntil(state, num_sims, deadline)
+
+        # a step is a whole number of batches or rounds of the threads of ArrayMCTS
+        step = EARLY_STOP_STEP * max(self.args.get('leafBatchSize', 1), self.args.get('numThreads', 1))
+        n = 0
+        while n < num_sims and not self.isDecided(state, max_sims - n):
+            sims = self.searchUntil(state, min(step, num_sims - n), deadline)
+            if sims == 0:
+                break  # proven (args.mctsSolver)
+            n += sims
+        return n
+
+    def isDecided(self, state, sims_left):
+        """
+        the most visited action of state stays the only most visited one
+        whatever the next sims_left simulations do, i.e. it has more than
+        sims_left visits more than the second
+        """
+        counts = sorted(self.getCounts(state), reverse=True)
+        return counts[0] - counts[1] > sims_left
+
+    def getBudget(self, state):
+        """
+        Returns:
+            num_sims: the simulations of the move, numMCTSSims (minus the visits
+                      the root already has with args.countRootVisits), or
+                      unlimited with a time budget
+            seconds: the time budget of the move, the smaller of args.moveTimeMs
+                     and a share of what is left of args.gameTimeMs, inf if none
+        """
+        num_sims, seconds = self.args.numMCTSSims, math.inf
+        move_time, game_time = self.args.get('moveTimeMs', None), self.args.get('gameTimeMs', None)
+
+        played_cells = int(np.count_nonzero(state.board))
+        if played_cells < self.game_played_cells:
+            self.game_time = 0  # a new game
+        self.game_played_cells = played_cells
+
+        if move_time:
+            seconds = move_time / 1000
+        if game_time:
+            # about half of the empty cells get played, half of them by us
+            moves_left = max(1, (81 - played_cells) // 4)
+            seconds = min(seconds, max(0, game_time / 1000 - self.game_time) / moves_left)
+        if seconds < math.inf:
+            num_sims = math.inf
+        elif self.args.get('countRootVisits', False):
+            # the visits from earlier searches (or ponder()) count
+            num_sims = max(0, num_sims - sum(self.getCounts(state)))
+
+        if self.args.get('adaptiveSims', False):
+            num_valids = int(np.count_nonzero(state.valid_moves))
+            if num_valids == 1:
+                return MIN_SIMS, seconds
+            if state.curr_area is not None:
+                num_sims, seconds = num_sims * SINGLE_AREA_FACTOR, seconds * SINGLE_AREA_FACTOR
+        return num_sims, seconds
+
+    def isSettled(self, state):
+        """the best action of state has SETTLED_RATIO times the visits of the second"""
+        counts = sorted(self.getCounts(state), reverse=True)
+        return counts[0] >= SETTLED_RATIO * counts[1]
+
+    def isProven(self, state):
+        """args.mctsSolver: whether the result of state is proven"""
+        return self.getKey(state)[0] in self.Ss
+
+    def getProvenMoves(self, state):
+        """
+        Returns:
+            moves: the moves of state (on its board) to children that keep its
+                   proven result, if state is proven won or drawn, else []
+        """
+        s, symmetry = self.getKey(state)
+        result = self.Ss.get(s)
+        if result not in (WIN, DRAW):
+            return []
+        child_result = LOSS if result == WIN else DRAW
+        actions = [a for a in np.flatnonzero(self.Vs[s]).tolist() if self.Ss.get(self.Cs.get((s, a))) == child_result]
+        return actions if symmetry is None else [int(symmetry[a]) for a in actions]
+
+    def solve(self, path):
+        """
+        args.mctsSolver: propagates the proven result of the leaf of path up
+        the path (MCTS-Solver), a board is proven
+            won if one of its children is proven lost,
+            lost if all its children are proven won,
+            drawn if all its children are proven, some drawn and none lost.
+        It stops at the first board that stays unproven.
+        """
+        for s, a in reversed(path):
+            child_result = self.Ss.get(self.Cs[(s, a)])
+            if child_result is None:
+                return
+            if child_result == LOSS:
+                self.Ss[s] = WIN
+                continue
+            results = [self.Ss.get(self.Cs.get((s, b))) for b in np.flatnonzero(self.Vs[s]).tolist()]
+            if LOSS in results:
+                # another child was proven lost through another parent (transposition)
+                self.Ss[s] = WIN
+            elif None in results:
+                return
+            else:
+                self.Ss[s] = DRAW if DRAW in results else LOSS
+
+    def evict(self):
+        """
+        Keeps the tree within args.maxNodes boards (if set): when it has more,
+        only the EVICTION_KEEP * maxNodes most recently visited boards are kept.
+        It is called before each search and after each simulation of
+        searchUntil() (a single len() when the tree is within budget), so the
+        tree never has more than maxNodes + 1 boards.
+        """
+        max_nodes = self.args.get('maxNodes', None)
+        if not max_nodes or len(self.Es) <= max_nodes:
+            return
+
+        by_last_visit = sorted(self.Es, key=self.Ts.__getitem__, reverse=True)
+        for s in by_last_visit[int(EVICTION_KEEP * max_nodes):]:
+            if s in self.Ps:
+                for a in np.flatnonzero(self.Vs[s]).tolist():
+                    self.Cs.pop((s, a), None)
+                del self.Qsa[s], self.Nsa[s], self.Ps[s], self.Vs[s], self.Ns[s]
+            del self.Es[s], self.Ts[s]
+            self.Ss.pop(s, None)
+        log.debug(f'Evicted {len(by_last_visit) - len(self.Es)} boards, {self.getTreeSize()}')
+
+    def getTreeSize(self):
+        """
+        Returns:
+            size: dict of the number of nodes (boards) and edges (s, a) in the
+                  tree, and its approximate size in bytes (the dicts and the
+                  Qsa, Nsa, Ps, Vs arrays, not the keys)
+        """
+        dicts = [self.Qsa, self.Nsa, self.Ns, self.Ps, self.Es, self.Vs, self.Ts, self.Ss, self.Cs]
+        num_bytes = sum(sys.getsizeof(d) for d in dicts) \
+            + sum(array.nbytes for d in [self.Qsa, self.Nsa, self.Ps, self.Vs] for array in d.values())
+        num_edges = sum(np.count_nonzero(n) for n in self.Nsa.values())
+        return {'nodes': len(self.Es), 'edges': num_edges, 'bytes': num_bytes}
+
+    def getCounts(self, state):
+        """
+        Returns:
+            counts: list of the visit counts Nsa[s][a] of the actions a of state
+        """
+        s, symmetry = self.getKey(state)
+        counts = self.Nsa[s].tolist() if s in self.Nsa else [0] * self.game.getActionSize()
+        if symmetry is not None:
+            # the edges of s are stored for the actions of the representative
+            counts = list(np.array(counts)[np.argsort(symmetry)])
+        return counts
+
     def search(self, canonicalBoard, curr_area):
         """
-        This function performs one iteration of MCTS. It is recursively called
-        till a leaf node is found. The action chosen at each node is one that
-        has the maximum upper confidence bound as in the paper.
+        This function performs one iteration of MCTS, see searchState().
+
+        Returns:
+            v: the negative of the value of the current canonicalBoard
+        """
+        return self.searchState(self.game.getGameState(canonicalBoard, 1, curr_area))
+
+    def searchState(self, state):
+        """
+        This function performs one iteration of MCTS. It descends the tree
+        from state till a leaf node is found, keeping the (s, a) pairs of the
+        path in a list instead of recursing. The action chosen at each node is
+        one that has the maximum upper confidence bound as in the paper.
 
         Once a leaf node is found, the neural network is called to return an
         initial policy P and a value v for the state. This value is propagated
         up the search path. In case the leaf node is a terminal state, the
         outcome is propagated up the search path. The values of Ns, Nsa, Qsa are
-        updated.
+        updated, in a single loop over the path from the leaf up.
 
         NOTE: the return values are the negative of the value of the current
         state. This is done since v is in [-1,1] and if v is the value of a
         state for the current player, then its value is -v for the other player.
 
+        state is the GameState of a canonical board (state.player == 1), the
+        next states are made with getNextGameState(), so position and zobrist
+        are stepped down the tree, and the key, valid moves, mask and game
+        ended of a state are computed at most once.
+
+        With args.mctsSolver, a proven board is not searched further: it ends
+        the path like a terminal one, with the value of its result, and the
+        proven children are never selected, see solve().
+
         Returns:
-            v: the negative of the value of the current canonicalBoard
+            v: the negative of the value of the current canonical board
         """
+        path = []  # (s, a) pairs from state to the leaf
+        self.clock += 1
+        solver = self.args.get('mctsSolver', False)
+
+        while True:
+            s, symmetry = self.getKey(state)
+            self.Ts[s] = self.clock
+            if solver and path:
+                self.Cs[path[-1]] = s
+
+            if s not in self.Es:
+                self.Es[s] = state.game_ended
+                if solver and self.Es[s] != 0:
+                    self.Ss[s] = proven_result(self.Es[s])
+            if self.Es[s] != 0:
+                # terminal node
+                v = -self.Es[s]
+                break
 
-        s = self.game.stringRepresentation(canonicalBoard, curr_area)
-        mask_2d = self.game.get_mask_2d(canonicalBoard, 1, curr_area)
+            if s in self.Ss:
+                # proven node
+                v = -PROVEN_VALUES[self.Ss[s]]
+                break
 
-        if s not in self.Es:
-            self.Es[s] = self.game.getGameEnded(canonicalBoard, 1, curr_area)
-        if self.Es[s] != 0:
-            # terminal node
-            return -self.Es[s]
+            if s not in self.Ps:
+                # leaf node
+                v = -self.expand(s, state, symmetry)
+                break
 
-        if s not in self.Ps:
-            # leaf node
-            self.Ps[s], v = self.nnet.predict(canonicalBoard, mask_2d)
-            valids = self.game.getValidMoves(canonicalBoard, 1, curr_area)
-            self.Ps[s] = self.Ps[s] * valids  # masking invalid moves
-            sum_Ps_s = np.sum(self.Ps[s])
-            if sum_Ps_s > 0:
-                self.Ps[s] /= sum_Ps_s  # renormalize
+            a = self.selectAction(s)
+            path.append((s, a))
+            # the action played on the board of state
+            move = a if symmetry is None else symmetry[a]
+            state = self.game.getCanonicalGameState(self.game.getNextGameState(state, move))
+
+        # v is the value of the leaf for the player of the last node of the path
+        for s, a in reversed(path):
+            if self.Nsa[s][a] > 0:
+                self.Qsa[s][a] = (self.Nsa[s][a] * self.Qsa[s][a] + v) / (self.Nsa[s][a] + 1)
             else:
-                # if all valid moves were masked make all valid moves equally probable
+                self.Qsa[s][a] = v
+            self.Nsa[s][a] += 1
 
-                # NB! All valid moves may be masked if either your NNet architecture is insufficient or you've get overfitting or something else.
-                # If you have got dozens or hundreds of these messages you should pay attention to your NNet and/or training process.   
-                log.error("All valid moves were masked, doing a workaround.")
-                self.Ps[s] = self.Ps[s] + valids
-                self.Ps[s] /= np.sum(self.Ps[s])
+            self.Ns[s] += 1
+            v = -v
 
-            self.Vs[s] = valids
-            self.Ns[s] = 0
-            return -v
+        if solver:
+            self.solve(path)
+        return v
 
-        valids = self.Vs[s]
-        cur_best = -float('inf')
-        best_act = -1
+    def expand(self, s, state, symmetry):
+        """
+        Sets Ps[s], Vs[s], Ns[s] and the (zero) Qsa[s], Nsa[s] of a leaf node,
+        with the policy of the network.
+
+        Returns:
+            v: the value of state from the network
+        """
+        valids = state.valid_moves
+        self.Ps[s], v = self.nnet.predict(state.board, state.mask_2d)
+        if symmetry is not None:
+            self.Ps[s], valids = self.Ps[s][symmetry], valids[symmetry]
+        self.Ps[s] = self.Ps[s] * valids.astype(float)  # masking invalid moves (valids are int8)
+        sum_Ps_s = np.sum(self.Ps[s])
+        if sum_Ps_s > 0:
+            self.Ps[s] /= sum_Ps_s  # renormalize
+        else:
+            # if all valid moves were masked make all valid moves equally probable
 
-        # pick the action with the highest upper confidence bound
-        for a in range(self.game.getActionSize()):
-            if valids[a]:
-                if (s, a) in self.Qsa:
-                    u = self.Qsa[(s, a)] + self.args.cpuct * self.Ps[s][a] * math.sqrt(self.Ns[s]) / (
-                            1 + self.Nsa[(s, a)])
-                else:
-                    u = self.args.cpuct * self.Ps[s][a] * math.sqrt(self.Ns[s] + EPS)  # Q = 0 ?
+            # NB! All valid moves may be masked if either your NNet architecture is insufficient or you've get overfitting or something else.
+            # If you have got dozens or hundreds of these messages you should pay attention to your NNet and/or training process.   
+            log.error("All valid moves were masked, doing a workaround.")
+            self.Ps[s] = self.Ps[s] + valids
+            self.Ps[s] /= np.sum(self.Ps[s])
 
-                if u > cur_best:
-                    cur_best = u
-                    best_act = a
+        self.Vs[s] = valids
+        self.Ns[s] = 0
+        self.Qsa[s] = np.zeros(self.game.getActionSize())
+        self.Nsa[s] = np.zeros(self.game.getActionSize(), dtype=np.int64)
+        return np.asarray(v, dtype=float).item()
 
-        a = best_act
-        next_s, next_player, curr_area = self.game.getNextState(canonicalBoard, 1, a, curr_area)
-        next_s, curr_area = self.game.getCanonicalForm(next_s, next_player, curr_area)
+    def selectAction(self, s):
+        """
+        Returns:
+            a: the action of the expanded node s with the highest upper confidence
+               bound (the first one on ties), but not to a proven child
+               (args.mctsSolver)
+        """
+        valids = self.Vs[s]
+        Ns, Nsa, Qsa, Ps = self.Ns[s], self.Nsa[s], self.Qsa[s], self.Ps[s]
 
-        v = self.search(next_s, curr_area)
+        # the upper confidence bounds of all the actions at once, the unvisited ones have
+        # Qsa = Nsa = 0 and sqrt(Ns + EPS)
+        sqrt_Ns = np.where(Nsa > 0, math.sqrt(Ns), math.sqrt(Ns + EPS))
+        u = Qsa + self.args.cpuct * Ps * sqrt_Ns / (1 + Nsa)
+        u[valids == 0] = -math.inf
+        if self.args.get('mctsSolver', False):
+            for a in np.flatnonzero(valids).tolist():
+                if self.Cs.get((s, a)) in self.Ss:
+                    u[a] = -math.inf
 
-        if (s, a) in self.Qsa:
-            self.Qsa[(s, a)] = (self.Nsa[(s, a)] * self.Qsa[(s, a)] + v) / (self.Nsa[(s, a)] + 1)
-            self.Nsa[(s, a)] += 1
+        best_act = int(np.argmax(u))
+        if u[best_act] == -math.inf:
+            # all the children are proven (reached from other boards), the next solve() proves s
+            best_act = int(np.flatnonzero(valids)[0])
+        return best_act
 
-        else:
-            self.Qsa[(s, a)] = v
-            self.Nsa[(s, a)] = 1
+    def getKey(self, state):
+        """
+        Returns:
+            s: the key of state in the tree
+            symmetry: None, or with args.symmetryKeys, the permutation from
+                      state to the representative of its symmetry class
+                      (see ImplementedGame.getSymmetryKey), then all symmetrical
+                      boards share s, and Ps[s], Vs[s] and the actions a of
+                      Qsa[s][a], Nsa[s][a] are those of the representative
+        """
+        if self.args.get('symmetryKeys', False):
+            return state.symmetry_key
+
+        if self.args.get('zobristDebug', False):
+            self.checkZobrist(state)
+        return state.key, None
+
+    def checkZobrist(self, state):
+        """
+        args.zobristDebug only: the zobrist carried down the tree must be the one
+        of the board of state, and no two boards may share a key.
+        """
+        if state.zobrist != self.game.getZobrist(state.board):
+            log.error(f'Carried zobrist {state.zobrist} does not match the board')
+            assert state.zobrist == self.game.getZobrist(state.board)
 
-        self.Ns[s] += 1
-        return -v
+        board_string = self.game.stringRepresentation(state.board, state.curr_area)
+        if self.Ks.setdefault(state.key, board_string) != board_string:
+            log.error(f'Zobrist key collision for key {state.key}')
+            assert self.Ks[state.key] == board_string
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class NeuralNet():
     """
     This class specifies the base NeuralNet class. To define your own neural
@@ -36,6 +39,20 @@ class NeuralNet():
         """
         pass
 
+    def predictBatch(self, boards, mask_2ds):
+        """
+        Input:
+            boards: K boards in their canonical form
+            mask_2ds: the K corresponding get_mask_2d()
+
+        Returns:
+            pis, vs: the K pi and v of predict(), one board at a time unless
+                     overridden with a batched forward pass
+        """
+        predictions = [self.predict(board, mask_2d) for board, mask_2d in zip(boards, mask_2ds)]
+        pis, vs = zip(*predictions)
+        return np.array(pis), np.array(vs)
+
     def save_checkpoint(self, folder, filename):
         """
         Saves the current neural network (with its parameters) in
@@ -0,0 +1,98 @@
+import math
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from MCTS import MCTS, EPS
+from ArrayMCTS import ArrayMCTS
+from implemented_NeuralNet import NNetWrapper
+from utils import dotdict
+from _test_utils import HashNet
+
+
+def dict_select(mcts, s):
+    """the selection of MCTS.selectAction(), one action at a time over the 81 actions"""
+    valids = mcts.Vs[s]
+    cur_best = -float('inf')
+    best_act = -1
+    for a in range(mcts.game.getActionSize()):
+        if valids[a]:
+            if mcts.Nsa[s][a] > 0:
+                u = mcts.Qsa[s][a] + mcts.args.cpuct * mcts.Ps[s][a] * math.sqrt(mcts.Ns[s]) / (1 + mcts.Nsa[s][a])
+            else:
+                u = mcts.args.cpuct * mcts.Ps[s][a] * math.sqrt(mcts.Ns[s] + EPS)
+            if u > cur_best:
+                cur_best = u
+                best_act = a
+    return best_act
+
+
+def loop_select(mcts, node):
+    """the selection of ArrayMCTS.selectEdge(), one edge at a time"""
+    cur_best = -float('inf')
+    best_edge = -1
+    start = mcts.edge_start[node]
+    for edge in range(start, start + mcts.edge_count[node]):
+        if mcts.Nsa[edge] > 0:
+            u = mcts.Qsa[edge] + mcts.args.cpuct * mcts.Ps[edge] * math.sqrt(mcts.Ns[node]) / (1 + mcts.Nsa[edge])
+        else:
+            u = mcts.args.cpuct * mcts.Ps[edge] * math.sqrt(mcts.Ns[node] + EPS)
+        if u > cur_best:
+            cur_best = u
+            best_edge = edge
+    return best_edge
+
+
+def rate(select, items, repeat=5):
+    start = time.time()
+    for _ in range(repeat):
+        for item in items:
+            select(item)
+    return repeat * len(items) / (time.time() - start)
+
+
+game = ImplementedGame('bitboard')
+args = dotdict({'numMCTSSims': 800, 'cpuct': 1})
+board, curr_area = game.getInitBoard()
+
+dict_mcts = MCTS(game, HashNet(game), args)
+array_mcts = ArrayMCTS(game, HashNet(game), args)
+dict_mcts.getActionProb(board, curr_area)
+array_mcts.getActionProb(board, curr_area)
+
+keys = list(dict_mcts.Ps)
+nodes = [array_mcts.nodes[s] for s in keys]
+same = all(array_mcts.actions[array_mcts.selectEdge(node)] == dict_select(dict_mcts, s) == dict_mcts.selectAction(s)
+           and loop_select(array_mcts, node) == array_mcts.selectEdge(node)
+           for s, node in zip(keys, nodes))
+print(f'{len(nodes)} expanded nodes, {np.mean(array_mcts.edge_count[nodes]):.1f} edges on average, '
+      f'same selections: {same}')
+print(f'MCTS, loop over 81 actions: {rate(lambda s: dict_select(dict_mcts, s), keys):.0f} selections/s')
+print(f'MCTS.selectAction():        {rate(dict_mcts.selectAction, keys):.0f} selections/s')
+print(f'ArrayMCTS, loop over edges: {rate(lambda node: loop_select(array_mcts, node), nodes):.0f} selections/s')
+print(f'ArrayMCTS.selectEdge():     {rate(array_mcts.selectEdge, nodes):.0f} selections/s')
+
+for mcts_class in [MCTS, ArrayMCTS]:
+    mcts = mcts_class(game, HashNet(game), args)
+    start = time.time()
+    mcts.getActionProb(board, curr_area)
+    print(f'{mcts_class.__name__}: {args.numMCTSSims / (time.time() - start):.0f} sims/s')
+
+# batched leaf evaluation with the (untrained) UTTTNet on CPU
+nnet = NNetWrapper(game)
+nnet.cache = None  # every setting evaluates its leaves, none is served by the evaluation cache of a previous one
+for batch_size in [1, 2, 4, 8, 16, 32]:
+    args = dotdict({'numMCTSSims': 400, 'cpuct': 1, 'leafBatchSize': batch_size})
+    mcts = ArrayMCTS(game, nnet, args)
+    start = time.time()
+    mcts.getActionProb(board, curr_area)
+    print(f'ArrayMCTS, UTTTNet, leafBatchSize={batch_size}: {args.numMCTSSims / (time.time() - start):.0f} sims/s')
+
+# tree-parallel search with a shared inference queue, UTTTNet on CPU
+for num_threads in [1, 2, 4, 8, 16]:
+    args = dotdict({'numMCTSSims': 400, 'cpuct': 1, 'numThreads': num_threads})
+    mcts = ArrayMCTS(game, nnet, args)
+    start = time.time()
+    mcts.getActionProb(board, curr_area)
+    print(f'ArrayMCTS, UTTTNet, numThreads={num_threads}: {args.numMCTSSims / (time.time() - start):.0f} sims/s')
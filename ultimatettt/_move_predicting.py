@@ -7,7 +7,7 @@ from implemented_NeuralNet import NNetWrapper
 from utils import *
 
 from Arena import Arena
-from MCTS import MCTS
+from ArrayMCTS import createMCTS
 
 from main import args
 
@@ -30,7 +30,7 @@ pnet.load_checkpoint(
 )
 board, curr_area = game.getInitBoard()
 
-mcts = MCTS(game, pnet, args)
+mcts = createMCTS(game, pnet, args)
 
 arena = Arena(
     # lambda x, y_curr_area: np.argmax(pmcts.getActionProb(x, y_curr_area, temp=0)),
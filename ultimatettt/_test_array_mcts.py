@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from MCTS import MCTS
+from ArrayMCTS import ArrayMCTS
+from utils import dotdict
+from _test_utils import HashNet
+
+
+def play(mcts_class, game, args, seed):
+    """a self-play game, returns the getActionProb() of every move and the time"""
+    mcts = mcts_class(game, HashNet(game), args)
+    rng = np.random.default_rng(seed)
+    board, curr_area = game.getInitBoard()
+    player = 1
+    all_probs = []
+    start = time.time()
+    while game.getGameEnded(board, player, curr_area) == 0:
+        canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+        probs = mcts.getActionProb(canonical_board, curr_area, temp=1)
+        all_probs.append(probs)
+        action = rng.choice(len(probs), p=probs)
+        board, player, curr_area = game.getNextState(board, player, action, curr_area)
+    return all_probs, time.time() - start
+
+
+for engine in ['original', 'bitboard']:
+    for symmetry_keys in [False, True]:
+        game = ImplementedGame(engine)
+        args = dotdict({'numMCTSSims': 50, 'cpuct': 1, 'symmetryKeys': symmetry_keys})
+        mismatches, n_moves, dict_time, array_time = 0, 0, 0, 0
+        for seed in range(3):
+            dict_probs, t = play(MCTS, game, args, seed)
+            dict_time += t
+            array_probs, t = play(ArrayMCTS, game, args, seed)
+            array_time += t
+            n_moves += len(dict_probs)
+            mismatches += len(dict_probs) != len(array_probs)
+            mismatches += sum(probs_1 != probs_2 for probs_1, probs_2 in zip(dict_probs, array_probs))
+        print(f'{engine}, symmetryKeys={symmetry_keys}: {n_moves} moves, {mismatches} mismatches, '
+              f'MCTS {dict_time:.2f} s, ArrayMCTS {array_time:.2f} s')
+
+
+# batched leaf evaluation, the visit counts must add up and the virtual losses be undone
+game = ImplementedGame('bitboard')
+board, curr_area = game.getInitBoard()
+for batch_size in [2, 8, 32]:
+    args = dotdict({'numMCTSSims': 400, 'cpuct': 1, 'leafBatchSize': batch_size})
+    mcts = ArrayMCTS(game, HashNet(game), args)
+    probs = mcts.getActionProb(board, curr_area)
+    root, _ = mcts.getNode(game.getGameState(board, 1, curr_area))
+    print(f'leafBatchSize={batch_size}: root visits {mcts.Ns[root]} (expected {args.numMCTSSims - 1}), '
+          f'counts {sum(mcts.getCounts(game.getGameState(board, 1, curr_area)))}, '
+          f'virtual losses left {mcts.virtual_Ns.sum() + mcts.virtual_Nsa.sum()}')
+
+# subtree reuse, the root keeps its visits and only its subtree is kept
+game = ImplementedGame('bitboard')
+args = dotdict({'numMCTSSims': 100, 'cpuct': 1, 'reuseSubtree': True})
+mcts = ArrayMCTS(game, HashNet(game), args)
+full_mcts = ArrayMCTS(game, HashNet(game), dotdict({'numMCTSSims': 100, 'cpuct': 1}))
+rng = np.random.default_rng(0)
+board, curr_area = game.getInitBoard()
+player = 1
+errors = 0
+while game.getGameEnded(board, player, curr_area) == 0:
+    canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+    state = game.getGameState(canonical_board, 1, curr_area)
+    node = mcts.nodes.get(mcts.getKey(state)[0])
+    visits_before = 0 if node is None else mcts.Ns[node] + 1
+    probs = mcts.getActionProb(canonical_board, curr_area)
+    full_mcts.getActionProb(canonical_board, curr_area)
+    errors += mcts.nodes[mcts.getKey(state)[0]] != 0 or mcts.Ns[0] + 1 != visits_before + args.numMCTSSims
+    errors += not np.all(mcts.children[:mcts.num_edges] < mcts.num_nodes)
+    errors += len(mcts.nodes) != mcts.num_nodes
+    action = rng.choice(len(probs), p=probs)
+    board, player, curr_area = game.getNextState(board, player, action, curr_area)
+print(f'reuseSubtree: {errors} errors, {mcts.num_nodes} nodes at the end ({full_mcts.num_nodes} without reuse)')
+
+# tree-parallel search, the visit counts must add up and the virtual losses be undone
+board, curr_area = game.getInitBoard()
+for num_threads in [2, 8]:
+    args = dotdict({'numMCTSSims': 400, 'cpuct': 1, 'numThreads': num_threads})
+    mcts = ArrayMCTS(game, HashNet(game), args)
+    probs = mcts.getActionProb(board, curr_area)
+    root, _ = mcts.getNode(game.getGameState(board, 1, curr_area))
+    print(f'numThreads={num_threads}: root visits {mcts.Ns[root]} (expected {args.numMCTSSims - 1}), '
+          f'virtual losses left {mcts.virtual_Ns.sum() + mcts.virtual_Nsa.sum()}')
+
+# node budget, both trees evict the same boards and stay within maxNodes
+game = ImplementedGame('bitboard')
+args = dotdict({'numMCTSSims': 100, 'cpuct': 1, 'maxNodes': 500})
+dict_probs, _ = play(MCTS, game, args, 0)
+array_probs, _ = play(ArrayMCTS, game, args, 0)
+mismatches = (len(dict_probs) != len(array_probs)) + sum(
+    probs_1 != probs_2 for probs_1, probs_2 in zip(dict_probs, array_probs))
+sizes = []
+for mcts_class in [MCTS, ArrayMCTS]:
+    mcts = mcts_class(game, HashNet(game), args)
+    board, curr_area = game.getInitBoard()
+    for _ in range(20):
+        probs = mcts.getActionProb(board, curr_area)
+        sizes.append(mcts.getTreeSize()['nodes'])
+        board, player, curr_area = game.getNextState(board, 1, int(np.argmax(probs)), curr_area)
+        board, curr_area = game.getCanonicalForm(board, player, curr_area)
+print(f'maxNodes={args.maxNodes}: {mismatches} mismatches, largest tree {max(sizes)} nodes, '
+      f'{mcts.getTreeSize()}')
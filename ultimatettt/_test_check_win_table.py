@@ -0,0 +1,38 @@
+import itertools
+import time
+
+import numpy as np
+
+from original_game import LogicUtils, CHECK_WIN_TABLE_BUILD_TIME
+
+
+def same_result(result_1, result_2):
+    return (np.isnan(result_1) and np.isnan(result_2)) or result_1 == result_2
+
+
+print(f'CHECK_WIN_TABLE built in {CHECK_WIN_TABLE_BUILD_TIME * 1000:.1f} ms')
+
+# areas: entries in {-1, 0, 1}, board: entries in {-1, 0, 1, nan}
+for name, entries in [('area', (-1, 0, 1)), ('board', (-1, 0, 1, np.nan))]:
+    mismatches = 0
+    n_arrays = 0
+    time_by_lines = 0
+    time_table = 0
+
+    for entries_9 in itertools.product(entries, repeat=9):
+        array = np.array(entries_9, dtype=float).reshape(3, 3)
+
+        start = time.perf_counter()
+        result_by_lines = LogicUtils().check_win_by_lines(array)
+        time_by_lines += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result_table = LogicUtils().check_win(array)
+        time_table += time.perf_counter() - start
+
+        mismatches += not same_result(result_by_lines, result_table)
+        n_arrays += 1
+
+    print(f'{name}: {n_arrays} arrays, {mismatches} mismatches, '
+          f'check_win_by_lines {time_by_lines / n_arrays * 1e6:.1f} us, '
+          f'check_win {time_table / n_arrays * 1e6:.1f} us')
@@ -20,4 +20,14 @@ print('-' * 50)
 # 4d <-> 1d
 a_1d = ImplementationUtils().cell_state_4d_to_1d(a)
 print(a_1d)
-print(np.all(ImplementationUtils().cell_state_1d_to_4d(a_1d) == a))
\ No newline at end of file
+print(np.all(ImplementationUtils().cell_state_1d_to_4d(a_1d) == a))
+print('-' * 50)
+
+# batched, (N, ...) stacks
+a_batch = np.arange(5 * 81).reshape(5, 3, 3, 3, 3)
+a_2d_batch = ImplementationUtils().cell_state_4d_to_2d_batch(a_batch)
+print(a_2d_batch.shape)
+print(all(np.all(a_2d_batch[n] == ImplementationUtils().cell_state_4d_to_2d(a_batch[n])) for n in range(5)))
+print(np.all(ImplementationUtils().cell_state_2d_to_4d_batch(a_2d_batch) == a_batch))
+a_1d_batch = ImplementationUtils().cell_state_4d_to_1d_batch(a_batch)
+print(np.all(ImplementationUtils().cell_state_1d_to_4d_batch(a_1d_batch) == a_batch))
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from implemented_NeuralNet import NNetWrapper
+from MCTS import MCTS
+from endgame_solver import EndgameSolver
+from utils import dotdict
+
+
+def negamax(state, memo):
+    """the exact value of a canonical state for its player by a full search, without pruning"""
+    if state.game_ended != 0:
+        return int(state.game_ended) if abs(state.game_ended) == 1 else 0
+    if state.key not in memo:
+        memo[state.key] = max(-negamax(game.getCanonicalGameState(game.getNextGameState(state, move)), memo)
+                              for move in np.flatnonzero(state.valid_moves).tolist())
+    return memo[state.key]
+
+
+def endgame_positions(open_cells, n, rng):
+    """n canonical (board, curr_area) of random games with open_cells open cells left"""
+    positions = []
+    while len(positions) < n:
+        board, curr_area = game.getInitBoard()
+        player = 1
+        while game.getGameEnded(board, player, curr_area) == 0:
+            canonical_board, canonical_area = game.getCanonicalForm(board, player, curr_area)
+            state = game.getGameState(canonical_board, 1, canonical_area)
+            if game.getPositionOpenCells(state.position) <= open_cells:
+                positions.append((canonical_board, canonical_area))
+                break
+            valids = np.flatnonzero(game.getValidMoves(board, player, curr_area))
+            board, player, curr_area = game.getNextState(board, player, int(rng.choice(valids)), curr_area)
+    return positions
+
+
+game = ImplementedGame('bitboard')
+nnet = NNetWrapper(game)
+nnet.cache = None  # every setting evaluates its leaves, none is served by the evaluation cache of a previous one
+rng = np.random.default_rng(0)
+
+# the solved values and moves are exact
+wrong = 0
+solver = EndgameSolver(game, nnet, dotdict({'endgameCells': 10, 'endgameMaxNodes': 10 ** 6}))
+for canonical_board, curr_area in endgame_positions(10, 20, rng):
+    state = game.getGameState(canonical_board, 1, curr_area)
+    memo = {}
+    value, moves = solver.solve(state)
+    wrong += value != negamax(state, memo)
+    for move in np.flatnonzero(state.valid_moves).tolist():
+        child_value = -negamax(game.getCanonicalGameState(game.getNextGameState(state, move)), memo)
+        wrong += (move in moves) != (child_value == value)
+print(f'20 positions with 10 open cells: {wrong} wrong values or moves')
+
+# solver vs a full MCTS call (numMCTSSims of main.py) with the UTTTNet
+for open_cells in [10, 14, 18, 22]:
+    args = dotdict({'numMCTSSims': 15, 'cpuct': 1, 'endgameCells': open_cells, 'endgameMaxNodes': 50000})
+    solved, solve_times, mcts_times = 0, [], []
+    for canonical_board, curr_area in endgame_positions(open_cells, 10, rng):
+        mcts = MCTS(game, nnet, args)
+        start = time.time()
+        mcts.getActionProb(canonical_board, curr_area, temp=0)
+        solve_times.append(time.time() - start)
+        solved += mcts.endgame_solver.last_solve['value'] is not None
+
+        mcts = MCTS(game, nnet, dotdict({**args, 'endgameCells': None}))
+        start = time.time()
+        mcts.getActionProb(canonical_board, curr_area, temp=0)
+        mcts_times.append(time.time() - start)
+    print(f'endgameCells={open_cells}: {solved}/10 solved within {args.endgameMaxNodes} nodes, '
+          f'{1000 * np.median(solve_times):.0f} ms median (max {1000 * max(solve_times):.0f}), '
+          f'MCTS {args.numMCTSSims} sims {1000 * np.median(mcts_times):.0f} ms median')
@@ -0,0 +1,131 @@
+import numpy as np
+
+from original_game import OriginalGame, LogicUtils
+from bitboard_game import BitboardGame
+from implemented_Game import ImplementedGame
+from batched_game import BatchedGame
+from exceptions import GameException
+
+
+def same_area(area_1, area_2):
+    return np.array_equal(area_1, area_2, equal_nan=True)
+
+
+def same_board(board_1, board_2):
+    return (np.isnan(board_1) and np.isnan(board_2)) or board_1 == board_2
+
+
+def same_state(original_game, bitboard_game):
+    return np.array_equal(original_game.cell_state, bitboard_game.cell_state) \
+        and same_area(original_game.area, bitboard_game.area) \
+        and same_board(original_game.board, bitboard_game.board) \
+        and original_game.curr_area == bitboard_game.curr_area \
+        and original_game.curr_player == bitboard_game.curr_player
+
+
+def raised_exception(game, move):
+    try:
+        game.check_playable_cell(move)
+    except GameException as e:
+        return type(e), str(e)
+    return None
+
+
+# OriginalGame vs BitboardGame, move for move
+rng = np.random.default_rng(0)
+mismatches = 0
+n_moves = 0
+
+for _ in range(50):
+    original_game = OriginalGame()
+    bitboard_game = BitboardGame()
+
+    while original_game.board == 0:
+        valids = original_game._get_valid_moves(
+            original_game.cell_state.copy(), original_game.curr_player, original_game.curr_area)
+        valids_bitboard = bitboard_game._get_valid_moves(
+            bitboard_game.cell_state, bitboard_game.curr_player, bitboard_game.curr_area)
+        mismatches += not np.array_equal(valids, valids_bitboard)
+
+        # valid moves are exactly the cells check_playable_cell() does not raise for
+        valids_by_exceptions = np.array(
+            [raised_exception(original_game, LogicUtils().k_to_xyij(k)) is None for k in range(81)])
+        mismatches += not np.array_equal(valids.reshape(81), valids_by_exceptions)
+
+        # illegal moves must raise the same exceptions
+        for k in map(int, rng.integers(81, size=5)):
+            xyij = LogicUtils().k_to_xyij(k)
+            mismatches += raised_exception(original_game, xyij) != raised_exception(bitboard_game, k)
+
+        k = int(rng.choice(np.flatnonzero(valids.reshape(81))))
+        original_game.execute_move(LogicUtils().k_to_xyij(k))
+        bitboard_game.execute_move(k)
+        n_moves += 1
+        mismatches += not same_state(original_game, bitboard_game)
+
+print(f'{n_moves} moves, {mismatches} mismatches')
+
+print('-' * 50)
+
+# ImplementedGame with both engines
+game = ImplementedGame()
+game_bitboard = ImplementedGame(engine='bitboard')
+mismatches = 0
+
+for _ in range(20):
+    board, curr_area = game.getInitBoard()
+    player = 1
+    while game.getGameEnded(board, player, curr_area) == 0:
+        valids = game.getValidMoves(board, player, curr_area)
+        mismatches += not np.array_equal(valids, game_bitboard.getValidMoves(board, player, curr_area))
+        mismatches += not np.array_equal(
+            game.get_mask_2d(board, player, curr_area), game_bitboard.get_mask_2d(board, player, curr_area))
+
+        action = rng.choice(np.flatnonzero(valids))
+        next_state = game.getNextState(board, player, action, curr_area)
+        next_state_bitboard = game_bitboard.getNextState(board, player, action, curr_area)
+        mismatches += not np.array_equal(next_state[0], next_state_bitboard[0])
+        mismatches += next_state[1:] != next_state_bitboard[1:]
+
+        board, player, curr_area = next_state
+        mismatches += game.getGameEnded(board, player, curr_area) \
+            != game_bitboard.getGameEnded(board, player, curr_area)
+
+print(f'{mismatches} mismatches')
+
+print('-' * 50)
+
+# BatchedGame vs ImplementedGame, 50 games in lockstep
+n_games = 50
+batched_game = BatchedGame(n_games)
+states = [game.getInitBoard() for _ in range(n_games)]
+states = [(board, 1, curr_area) for board, curr_area in states]
+mismatches = 0
+
+while True:
+    canonical_boards, curr_areas = batched_game.canonical()
+    for n, (board, player, curr_area) in enumerate(states):
+        canonical_board, _ = game.getCanonicalForm(board, player, curr_area)
+        mismatches += not np.array_equal(canonical_boards[n], canonical_board)
+        mismatches += curr_areas[n] != curr_area
+        mismatches += batched_game.game_ended()[n] != game.getGameEnded(board, player, curr_area)
+        mismatches += not np.array_equal(batched_game.valid_moves()[n], game.getValidMoves(board, player, curr_area))
+        mismatches += not np.array_equal(batched_game.masks_2d()[n], game.get_mask_2d(board, player, curr_area))
+
+    ended = batched_game.game_ended() != 0
+    if np.all(ended):
+        break
+
+    valids = batched_game.valid_moves()
+    actions = np.array([rng.choice(np.flatnonzero(valids[n])) if not ended[n] else 0 for n in range(n_games)])
+    batched_game.next_states(actions)
+    states = [state if ended[n] else game.getNextState(state[0], state[1], actions[n], state[2])
+              for n, state in enumerate(states)]
+
+rebuilt_game = BatchedGame.from_boards(
+    [board for board, _, _ in states], [player for _, player, _ in states], [curr_area for _, _, curr_area in states])
+mismatches += not np.array_equal(rebuilt_game.area, batched_game.area, equal_nan=True)
+mismatches += not np.array_equal(rebuilt_game.board, batched_game.board, equal_nan=True)
+mismatches += not np.array_equal(rebuilt_game.curr_area, batched_game.curr_area)
+
+print(f'{mismatches} mismatches')
@@ -0,0 +1,78 @@
+import tempfile
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from implemented_NeuralNet import NNetWrapper, args as nnet_args
+from MCTS import MCTS
+from utils import dotdict
+
+
+game = ImplementedGame('bitboard')
+nnet = NNetWrapper(game)
+rng = np.random.default_rng(0)
+
+# some positions of random games
+states = []
+board, curr_area = game.getInitBoard()
+player = 1
+while game.getGameEnded(board, player, curr_area) == 0:
+    canonical_board, canonical_area = game.getCanonicalForm(board, player, curr_area)
+    states.append(game.getGameState(canonical_board, 1, canonical_area))
+    valids = np.flatnonzero(game.getValidMoves(board, player, curr_area))
+    board, player, curr_area = game.getNextState(board, player, int(rng.choice(valids)), curr_area)
+boards = [state.board for state in states]
+masks = [state.mask_2d for state in states]
+
+# the cached evaluations are those of the network, for predict() and predictBatch()
+uncached = nnet.cache
+nnet.cache = None
+expected = [nnet.predict(board, mask) for board, mask in zip(boards, masks)]
+nnet.cache = uncached
+half = len(boards) // 2
+for board, mask in zip(boards[:half], masks[:half]):
+    nnet.predict(board, mask)
+pis, vs = nnet.predictBatch(boards, masks)  # half hits, half misses
+cached = [nnet.predict(board, mask) for board, mask in zip(boards, masks)]  # all hits
+same = all(np.allclose(pi, e_pi, atol=1e-6) and np.allclose(v, e_v, atol=1e-6)
+           for (pi, v), (e_pi, e_v) in zip(list(zip(pis, vs)) + cached, expected + expected))
+print(f'{len(boards)} positions, same evaluations: {same}, {nnet.cache.getStats()}')
+
+# the cache is dropped when the weights change
+with tempfile.TemporaryDirectory() as folder:
+    nnet.save_checkpoint(folder=folder, filename='cache.pth.tar')
+    nnet.load_checkpoint(folder=folder, filename='cache.pth.tar')
+hits = nnet.cache.hits
+nnet.predict(boards[0], masks[0])
+print(f'after load_checkpoint: version {nnet.version}, {nnet.cache.hits - hits} hits, size {len(nnet.cache.entries)}')
+
+# the cache keeps at most eval_cache_size evaluations, the least recently used are dropped
+small = NNetWrapper(game)
+small.cache.max_size = 10
+for board, mask in zip(boards, masks):
+    small.predict(board, mask)
+small.predict(boards[-1], masks[-1])
+small.predict(boards[0], masks[0])
+print(f'max_size 10: size {len(small.cache.entries)}, {small.cache.getStats()}')
+
+# episodes with a fresh MCTS each: self-play (temp=1) as Coach.learn(), where the openings are evaluated
+# once, and arena games (temp=0), that replay the same positions
+args = dotdict({'numMCTSSims': 25, 'cpuct': 1})
+for temp in [1, 0]:
+    for cache_size in [0, nnet_args.eval_cache_size]:
+        nnet = NNetWrapper(game)
+        if not cache_size:
+            nnet.cache = None
+        start = time.time()
+        for episode in range(4):
+            mcts = MCTS(game, nnet, args)
+            board, curr_area = game.getInitBoard()
+            player = 1
+            while game.getGameEnded(board, player, curr_area) == 0:
+                canonical_board, canonical_area = game.getCanonicalForm(board, player, curr_area)
+                probs = mcts.getActionProb(canonical_board, canonical_area, temp=temp)
+                action = rng.choice(len(probs), p=probs)
+                board, player, curr_area = game.getNextState(board, player, action, curr_area)
+        stats = nnet.cache.getStats() if nnet.cache is not None else 'no cache'
+        print(f'4 episodes, temp={temp}, eval_cache_size={cache_size}: {time.time() - start:.1f} s, {stats}')
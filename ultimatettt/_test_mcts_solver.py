@@ -0,0 +1,102 @@
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from MCTS import MCTS, WIN, LOSS, DRAW
+from ArrayMCTS import ArrayMCTS
+from utils import dotdict
+from _test_utils import HashNet
+
+
+class TooLong(Exception):
+    pass
+
+
+def negamax(state, memo, max_size=20000):
+    """the exact result of a canonical state for its player by a full search, TooLong over max_size states"""
+    if state.key in memo:
+        return memo[state.key]
+    if len(memo) >= max_size:
+        raise TooLong()
+    if state.game_ended != 0:
+        result = {1: WIN, -1: LOSS}.get(state.game_ended, DRAW)
+    else:
+        results = [negamax(game.getCanonicalGameState(game.getNextGameState(state, move)), memo, max_size)
+                   for move in np.flatnonzero(state.valid_moves).tolist()]
+        result = WIN if LOSS in results else DRAW if DRAW in results else LOSS
+    memo[state.key] = result
+    return result
+
+
+# endgame positions: a few moves before the end of random games, small enough for a full search
+game = ImplementedGame('bitboard')
+rng = np.random.default_rng(0)
+positions, memos = [], []
+while len(positions) < 60:
+    board, curr_area = game.getInitBoard()
+    player, history = 1, []
+    while game.getGameEnded(board, player, curr_area) == 0:
+        history.append(game.getCanonicalForm(board, player, curr_area))
+        valids = np.flatnonzero(game.getValidMoves(board, player, curr_area))
+        board, player, curr_area = game.getNextState(board, player, int(rng.choice(valids)), curr_area)
+    canonical_board, curr_area = history[-rng.integers(1, min(len(history), 12) + 1)]
+    memo = {}
+    try:
+        negamax(game.getGameState(canonical_board, 1, curr_area), memo)
+    except TooLong:
+        continue
+    positions.append((canonical_board, curr_area))
+    memos.append(memo)
+
+# the proven results are exact and the same in both trees, the search stops once the root is proven
+wrong, mismatches, sims, sims_proven = 0, 0, [], []
+for (canonical_board, curr_area), memo in zip(positions, memos):
+    trees = []
+    for mcts_class in [MCTS, ArrayMCTS]:
+        mcts = mcts_class(game, HashNet(game), dotdict({'numMCTSSims': 2000, 'cpuct': 1, 'mctsSolver': True}))
+        probs = mcts.getActionProb(canonical_board, curr_area, temp=0)
+        trees.append((mcts, probs))
+
+    (mcts, probs), (array_mcts, array_probs) = trees
+    state = game.getGameState(canonical_board, 1, curr_area)
+    array_results = {s: int(array_mcts.proven[node]) for s, node in array_mcts.nodes.items()
+                     if array_mcts.proven[node] != 0}
+    mismatches += (mcts.Ss != array_results) + (mcts.getCounts(state) != array_mcts.getCounts(state))
+    # every proven board of both trees is exact (the tree keys are state.key, as in memo)
+    wrong += sum(memo[s] != result for s, result in mcts.Ss.items())
+    wrong += sum(memo[s] != result for s, result in array_results.items())
+
+    root_result = mcts.Ss.get(mcts.getKey(state)[0])
+    if root_result is None:
+        sims.append(mcts.last_search['sims'])
+        continue
+    sims_proven.append(mcts.last_search['sims'])
+    if root_result in (WIN, DRAW):
+        # the chosen move keeps the result
+        child = game.getCanonicalGameState(game.getNextGameState(state, int(np.argmax(probs))))
+        wrong += memo[child.key] != (LOSS if root_result == WIN else DRAW)
+
+print(f'{len(positions)} endgame positions: {len(sims_proven)} proven roots '
+      f'(after {min(sims_proven, default=0)}-{max(sims_proven, default=0)} sims), '
+      f'{len(sims)} unproven ({sims} sims), {wrong} wrong results, {mismatches} MCTS/ArrayMCTS mismatches')
+
+# a child proven lost through another parent (transposition) proves the board won, even when the child
+# on the path is proven won
+mcts = MCTS(game, HashNet(game), dotdict({'numMCTSSims': 1, 'cpuct': 1, 'mctsSolver': True}))
+mcts.Vs['s'] = np.zeros(81, dtype=np.int8)
+mcts.Vs['s'][[3, 5]] = 1
+mcts.Cs[('s', 3)], mcts.Cs[('s', 5)] = 'lost', 'won'
+mcts.Ss['lost'], mcts.Ss['won'] = LOSS, WIN
+mcts.solve([('s', 5)])
+
+array_mcts = ArrayMCTS(game, HashNet(game), dotdict({'numMCTSSims': 1, 'cpuct': 1, 'mctsSolver': True}))
+node, lost, won = array_mcts.newNode(0), array_mcts.newNode(0), array_mcts.newNode(0)
+array_mcts.proven[lost], array_mcts.proven[won] = LOSS, WIN
+array_mcts.edge_start[node], array_mcts.edge_count[node] = array_mcts.newEdges([3, 5], [0.5, 0.5]), 2
+array_mcts.children[array_mcts.edge_start[node] + np.arange(2)] = [lost, won]
+array_mcts.solve([(node, array_mcts.edge_start[node] + 1)])
+print(f'transposition: MCTS {mcts.Ss["s"] == WIN}, ArrayMCTS {array_mcts.proven[node] == WIN}')
+
+# without mctsSolver, the search takes the whole budget
+mcts = MCTS(game, HashNet(game), dotdict({'numMCTSSims': 2000, 'cpuct': 1}))
+mcts.getActionProb(*positions[0], temp=0)
+print(f'without mctsSolver: {mcts.last_search["sims"]} sims')
@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from implemented_NeuralNet import NNetWrapper
+from ArrayMCTS import createMCTS
+from ponderer import Ponderer
+from utils import dotdict
+
+
+# the GUI flow: the AI moves, the human thinks for THINK_TIME seconds, then plays
+# the reply the pondering expected (the most visited), and the AI replies
+THINK_TIME = 3
+game = ImplementedGame('bitboard')
+nnet = NNetWrapper(game)
+nnet.cache = None  # every setting evaluates its leaves, none is served by the evaluation cache of a previous one
+
+for array_tree in [False, True]:
+    for ponder in [False, True]:
+        args = dotdict({'numMCTSSims': 200, 'cpuct': 1, 'arrayTree': array_tree, 'reuseSubtree': array_tree,
+                        'countRootVisits': ponder})
+        mcts = createMCTS(game, nnet, args)
+        ponderer = Ponderer(mcts)
+        board, curr_area = game.getInitBoard()
+        latencies = []
+        for _ in range(4):
+            # the AI (player 1) moves
+            start = time.time()
+            action = int(np.argmax(mcts.getActionProb(board, curr_area, temp=0)))
+            latencies.append(time.time() - start)
+            board, player, curr_area = game.getNextState(board, 1, action, curr_area)
+
+            # the human (player -1) thinks
+            human_board, human_area = game.getCanonicalForm(board, player, curr_area)
+            if ponder:
+                ponderer.start(human_board, human_area)
+            time.sleep(THINK_TIME)
+            ponderer.stop()
+            counts = mcts.getCounts(game.getGameState(human_board, 1, human_area))
+            valids = game.getValidMoves(human_board, 1, human_area)
+            human_action = int(np.argmax(np.array(counts) + valids))  # a valid move, the expected one if pondered
+            board, player, curr_area = game.getNextState(board, player, human_action, curr_area)
+
+        print(f'arrayTree={array_tree}, ponder={ponder}: AI move latencies (ms) '
+              f'{[round(1000 * latency) for latency in latencies]}'
+              + (f', last ponder {mcts.last_ponder["sims"]} sims' if ponder else ''))
+
+# ponderMaxVisits: pondering stops by itself, the tree does not grow with the time the human takes
+for array_tree in [False, True]:
+    args = dotdict({'numMCTSSims': 200, 'cpuct': 1, 'arrayTree': array_tree, 'countRootVisits': True,
+                    'ponderMaxVisits': 500})
+    mcts = createMCTS(game, nnet, args)
+    ponderer = Ponderer(mcts)
+    board, curr_area = game.getInitBoard()
+    start = time.time()
+    ponderer.start(board, curr_area)
+    ponderer.thread.join(timeout=10 * THINK_TIME)
+    finished = not ponderer.thread.is_alive()
+    ponderer.stop()
+    visits = sum(mcts.getCounts(game.getGameState(board, 1, curr_area)))
+    print(f'arrayTree={array_tree}, ponderMaxVisits={args.ponderMaxVisits}: stopped by itself {finished} '
+          f'after {time.time() - start:.1f} s, {visits} root visits, {mcts.getTreeSize()["nodes"]} nodes')
@@ -0,0 +1,89 @@
+import math
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from MCTS import MCTS
+from ArrayMCTS import ArrayMCTS
+from utils import dotdict
+from _test_utils import HashNet
+
+
+game = ImplementedGame('bitboard')
+board, curr_area = game.getInitBoard()
+
+# moveTimeMs: the search stops at the deadline, whatever the mode
+for mcts_class, extra_args in [(MCTS, {}), (ArrayMCTS, {}),
+                               (ArrayMCTS, {'leafBatchSize': 8}), (ArrayMCTS, {'numThreads': 4})]:
+    args = dotdict({'numMCTSSims': 25, 'cpuct': 1, 'moveTimeMs': 200, **extra_args})
+    mcts = mcts_class(game, HashNet(game), args)
+    start = time.time()
+    mcts.getActionProb(board, curr_area)
+    print(f'{mcts_class.__name__} {extra_args}, moveTimeMs={args.moveTimeMs}: '
+          f'{1000 * (time.time() - start):.0f} ms, {mcts.last_search["sims"]} sims')
+
+# moveTimeMs with maxNodes: the tree is evicted during the search, it has many more simulations than maxNodes
+for mcts_class, extra_args in [(MCTS, {}), (ArrayMCTS, {}),
+                               (ArrayMCTS, {'leafBatchSize': 8}), (ArrayMCTS, {'numThreads': 4})]:
+    args = dotdict({'numMCTSSims': 25, 'cpuct': 1, 'moveTimeMs': 200, 'maxNodes': 300, **extra_args})
+    mcts = mcts_class(game, HashNet(game), args)
+    mcts.getActionProb(board, curr_area)
+    print(f'{mcts_class.__name__} {extra_args}, moveTimeMs={args.moveTimeMs}, maxNodes={args.maxNodes}: '
+          f'{mcts.last_search["sims"]} sims, {mcts.getTreeSize()["nodes"]} nodes')
+
+# gameTimeMs: a whole self-play game within the budget
+args = dotdict({'numMCTSSims': 25, 'cpuct': 1, 'gameTimeMs': 3000})
+mcts = ArrayMCTS(game, HashNet(game), args)
+for _ in range(2):  # the second game must start with a fresh budget
+    board, curr_area = game.getInitBoard()
+    player, moves, start = 1, 0, time.time()
+    while game.getGameEnded(board, player, curr_area) == 0:
+        canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+        probs = mcts.getActionProb(canonical_board, curr_area, temp=0)
+        board, player, curr_area = game.getNextState(board, player, int(np.argmax(probs)), curr_area)
+        moves += 1
+    print(f'gameTimeMs={args.gameTimeMs}: {moves} moves in {1000 * (time.time() - start):.0f} ms '
+          f'(search {1000 * mcts.game_time:.0f} ms)')
+
+# adaptiveSims: fewer simulations on forced moves and in a single area, more while unsettled
+args = dotdict({'numMCTSSims': 100, 'cpuct': 1, 'adaptiveSims': True})
+sims = {'forced': [], 'single area': [], 'any area': []}
+rng = np.random.default_rng(0)
+for _ in range(3):
+    mcts = MCTS(game, HashNet(game), args)
+    board, curr_area = game.getInitBoard()
+    player = 1
+    while game.getGameEnded(board, player, curr_area) == 0:
+        canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+        probs = mcts.getActionProb(canonical_board, curr_area)
+        if np.count_nonzero(game.getValidMoves(canonical_board, 1, curr_area)) == 1:
+            sims['forced'].append(mcts.last_search['sims'])
+        else:
+            sims['any area' if curr_area is None else 'single area'].append(mcts.last_search['sims'])
+        board, player, curr_area = game.getNextState(board, player, rng.choice(len(probs), p=probs), curr_area)
+print(f'adaptiveSims, numMCTSSims={args.numMCTSSims}: ' + ', '.join(
+    f'{kind} {min(n)}-{max(n)} sims ({len(n)} moves)' for kind, n in sims.items() if n))
+
+# earlyStop: temp=0 searches stop once the most visited action is decided, the saved simulations would not change it
+for mcts_class, extra_args in [(MCTS, {}), (MCTS, {'adaptiveSims': True}), (ArrayMCTS, {'leafBatchSize': 8})]:
+    rng = np.random.default_rng(0)
+    board, curr_area = game.getInitBoard()
+    player, same, stopped, saved, sims = 1, 0, 0, [], []
+    while game.getGameEnded(board, player, curr_area) == 0:
+        canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+        args = dotdict({'numMCTSSims': 200, 'cpuct': 1, 'earlyStop': True, **extra_args})
+        mcts = mcts_class(game, HashNet(game), args)
+        move = int(np.argmax(mcts.getActionProb(canonical_board, curr_area, temp=0)))
+        saved.append(mcts.last_search['saved'])
+        sims.append(mcts.last_search['sims'])
+        if saved[-1] > 0:
+            # without an early stop, getActionProb() breaks the ties at random, unlike np.argmax()
+            state = game.getGameState(canonical_board, 1, curr_area)
+            mcts.searchUntil(state, saved[-1], math.inf)
+            same += move == int(np.argmax(mcts.getCounts(state)))
+            stopped += 1
+        valids = np.flatnonzero(game.getValidMoves(canonical_board, 1, curr_area))
+        board, player, curr_area = game.getNextState(board, player, int(rng.choice(valids)), curr_area)
+    print(f'{mcts_class.__name__} {extra_args}, earlyStop, numMCTSSims=200: {np.mean(sims):.0f} sims and '
+          f'{np.mean(saved):.0f} saved per move on average, same move after the saved sims {same}/{stopped}')
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+
+from implemented_Game import ImplementedGame, ImplementationUtils
+
+
+# the flip/rot90 implementation getSymmetries() had before the symmetry tables
+def getSymmetries_by_flips(board, pi, curr_area):
+    """a list of [(board, pi, curr_area)], the 64 symmetrical forms"""
+    cell_state_original = ImplementationUtils().cell_state_2d_to_4d(board)
+    pi_4d_original = ImplementationUtils().cell_state_1d_to_4d(pi)
+    if curr_area is not None:
+        curr_area_tracker_original = np.zeros((3,3))
+        curr_area_tracker_original[curr_area] = 1
+    
+    symmForms = list()
+
+    for flip_big in [False, True]:
+        for flip_small in [False, True]:
+            for k_big in range(4):
+                for k_small in range(4):
+
+                    # init
+                    cell_state = cell_state_original.copy()
+                    pi_4d = pi_4d_original.copy()
+                    if curr_area is not None:
+                        curr_area_tracker = curr_area_tracker_original.copy()
+
+                    # flip big
+                    if flip_big:
+                        cell_state = np.flip(cell_state, axis=0)
+                        pi_4d = np.flip(pi_4d, axis=0)
+                        if curr_area is not None:
+                            curr_area_tracker = np.flip(curr_area_tracker, axis=0)
+                    
+                    # flip small
+                    if flip_small:
+                        cell_state = np.flip(cell_state, axis=2)
+                        pi_4d = np.flip(pi_4d, axis=2)
+                    
+                    # rotate
+                    cell_state = np.rot90(cell_state, k=k_big, axes=(0, 1))
+                    cell_state = np.rot90(cell_state, k=k_small, axes=(2, 3))
+
+                    pi_4d = np.rot90(pi_4d, k=k_big, axes=(0, 1))
+                    pi_4d = np.rot90(pi_4d, k=k_small, axes=(2, 3))
+
+                    if curr_area is not None:
+                        curr_area_tracker = np.rot90(curr_area_tracker, k=k_big, axes=(0, 1))
+                        
+                    # add result
+                    symmForms.append(
+                        (
+                            ImplementationUtils().cell_state_4d_to_2d(cell_state),  # board
+                            ImplementationUtils().cell_state_4d_to_1d(pi_4d),  # pi
+                            None if curr_area is None \
+                                else tuple(np.argwhere(curr_area_tracker == 1).reshape(2))  # curr_area
+                        )
+                    )
+    
+    return symmForms
+
+
+game = ImplementedGame(engine='bitboard')
+rng = np.random.default_rng(0)
+mismatches = 0
+n_positions = 0
+time_by_flips = 0
+time_batch = 0
+
+for _ in range(10):
+    board, curr_area = game.getInitBoard()
+    player = 1
+    while game.getGameEnded(board, player, curr_area) == 0:
+        canonical_board, curr_area = game.getCanonicalForm(board, player, curr_area)
+        pi = rng.random(81)
+
+        start = time.perf_counter()
+        symm_forms = getSymmetries_by_flips(canonical_board, pi, curr_area)
+        time_by_flips += time.perf_counter() - start
+
+        start = time.perf_counter()
+        boards, pis, curr_areas, masks = game.getSymmetriesBatch(canonical_board, pi, curr_area)
+        time_batch += time.perf_counter() - start
+
+        mismatches += len(symm_forms) != len(boards)
+        for (b, p, a), b_, p_, a_, mask_ in zip(symm_forms, boards, pis, curr_areas, masks):
+            mismatches += not np.array_equal(b, b_)
+            mismatches += not np.array_equal(p, p_)
+            mismatches += a != a_
+            mismatches += not np.array_equal(game.get_mask_2d(b, 1, a), mask_)
+        n_positions += 1
+
+        action = rng.choice(np.flatnonzero(game.getValidMoves(board, player, curr_area)))
+        board, player, curr_area = game.getNextState(board, player, action, curr_area)
+
+print(f'{n_positions} positions, {mismatches} mismatches')
+print(f'flips: {time_by_flips / n_positions * 1e3:.2f} ms, tables: {time_batch / n_positions * 1e3:.2f} ms')
@@ -0,0 +1,13 @@
+import hashlib
+
+import numpy as np
+
+from NeuralNet import NeuralNet
+
+
+class HashNet(NeuralNet):
+    """a deterministic stand-in for NNetWrapper, the outputs only depend on the board"""
+    def predict(self, board, mask_2d):
+        h = hashlib.md5(np.asarray(board, dtype=np.int8).tobytes()).digest()
+        rng = np.random.default_rng(int.from_bytes(h[:8], 'little'))
+        return rng.random(81), rng.random() * 2 - 1
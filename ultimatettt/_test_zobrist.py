@@ -0,0 +1,25 @@
+import numpy as np
+
+from implemented_Game import ImplementedGame
+from MCTS import MCTS
+from utils import dotdict
+from _test_utils import HashNet
+
+
+# zobristDebug: MCTS checks every key against the full board, self-play games must raise no error
+for engine in ['original', 'bitboard']:
+    game = ImplementedGame(engine)
+    args = dotdict({'numMCTSSims': 50, 'cpuct': 1, 'zobristDebug': True})
+    rng = np.random.default_rng(0)
+    moves, boards = 0, 0
+    for _ in range(3):
+        mcts = MCTS(game, HashNet(game), args)
+        board, curr_area = game.getInitBoard()
+        player = 1
+        while game.getGameEnded(board, player, curr_area) == 0:
+            canonical_board, canonical_area = game.getCanonicalForm(board, player, curr_area)
+            probs = mcts.getActionProb(canonical_board, canonical_area, temp=1)
+            board, player, curr_area = game.getNextState(board, player, rng.choice(len(probs), p=probs), curr_area)
+            moves += 1
+        boards += len(mcts.Ks)
+    print(f'{engine}, zobristDebug: 3 self-play games, {moves} moves, {boards} boards checked without collision')
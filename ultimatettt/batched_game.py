@@ -0,0 +1,134 @@
+import numpy as np
+
+from original_game import AREA_FULL, CHECK_WIN_TABLE, POWERS_OF_2
+from implemented_Game import ImplementationUtils
+from exceptions import GameException
+
+
+class BatchedGame():
+    """
+    N games held as stacked arrays and stepped together with numpy, a companion
+    of ImplementedGame for drivers that play many games in lockstep.
+
+    Every method works on all N games at once, games that already ended are
+    left unchanged by next_states().
+    """
+
+    def __init__(self, n):
+        """
+        cells: int8 array of size (N, 81), indexed by k (see LogicUtils.k_to_xyij),
+               so cells.reshape(N, 9, 9)[:, 3*x + y, 3*i + j] is the cell (x, y, i, j)
+
+        area, board entries (as OriginalGame):
+            0: not determined
+            nan: draw
+            1: X (player 1) won
+            -1: O (player 2) won
+
+        curr_area: int array of size (N, ), 3*x + y of the next area, -1 for None
+        curr_player: int array of size (N, )
+        """
+        self.n = n
+        self.cells = np.zeros((n, 81), dtype=np.int8)
+        self.area = np.zeros((n, 9), dtype=float)
+        self.board = np.zeros(n, dtype=float)
+        self.curr_area = np.full(n, -1, dtype=int)
+        self.curr_player = np.ones(n, dtype=int)
+
+    @classmethod
+    def from_boards(cls, boards, players, curr_areas):
+        """
+        Input:
+            boards: (N, 9, 9) boards, as used by ImplementedGame
+            players: (N, ) current players
+            curr_areas: N curr_area, (x, y) or None
+        """
+        batched_game = cls(len(boards))
+        batched_game.cells[:] = ImplementationUtils().cell_state_4d_to_1d_batch(
+            ImplementationUtils().cell_state_2d_to_4d_batch(boards))
+        batched_game.curr_player[:] = players
+        batched_game.curr_area[:] = [-1 if curr_area is None else 3*curr_area[0] + curr_area[1]
+                                     for curr_area in curr_areas]
+
+        cells = batched_game.cells.reshape(-1, 9, 9)
+        batched_game.area[:] = batched_game._check_win(cells == 1, cells == -1)
+        batched_game.update_boards(np.arange(batched_game.n))
+        return batched_game
+
+    def _check_win(self, x_entries, o_entries, filled_entries=None):
+        """
+        Input:
+            x_entries, o_entries -- bool arrays of size (..., 9)
+            filled_entries -- as LogicUtils.check_win_bits(), defaults to x_entries | o_entries
+
+        Output:
+            float array of size (...), LogicUtils().check_win() of each 3x3 array
+        """
+        winners = CHECK_WIN_TABLE[x_entries @ POWERS_OF_2, o_entries @ POWERS_OF_2]
+        if filled_entries is not None:
+            drawn = (winners == 0) & (filled_entries @ POWERS_OF_2 == AREA_FULL)
+            winners = np.where(drawn, np.nan, winners)
+        return winners
+
+    def update_boards(self, indices):
+        area = self.area[indices]
+        self.board[indices] = self._check_win(area == 1, area == -1, area != 0)
+
+    def next_states(self, actions):
+        """
+        Input:
+            actions: int array of size (N, ), the action of the current player of
+                     each game, ignored for the games that ended
+
+        Explain:
+            plays all actions in place, only the played areas and the boards of
+            the games are checked again
+        """
+        actions = np.asarray(actions)
+        indices = np.flatnonzero(self.board == 0)
+        actions = actions[indices]
+        if not np.all(self.valid_moves()[indices, actions]):
+            raise GameException(f'Invalid actions for games {indices[self.valid_moves()[indices, actions] == 0]}')
+
+        played_areas = actions // 9
+        self.cells[indices, actions] = self.curr_player[indices]
+        area_cells = self.cells.reshape(-1, 9, 9)[indices, played_areas]
+        self.area[indices, played_areas] = self._check_win(area_cells == 1, area_cells == -1)
+        self.update_boards(indices)
+
+        self.curr_player[indices] = -self.curr_player[indices]
+        next_areas = actions % 9
+        self.curr_area[indices] = np.where(self.area[indices, next_areas] == 0, next_areas, -1)
+
+    def valid_moves(self):
+        """int8 array of size (N, 81), getValidMoves() of each game"""
+        playable_areas = (self.area == 0) & (self.board == 0)[:, None]
+        playable_areas &= (self.curr_area[:, None] == -1) | (self.curr_area[:, None] == np.arange(9))
+        valid_moves = (self.cells.reshape(-1, 9, 9) == 0) & playable_areas[:, :, None]
+        return valid_moves.reshape(-1, 81).astype(np.int8)
+
+    def masks_2d(self):
+        """int8 array of size (N, 9, 9), get_mask_2d() of each game"""
+        return ImplementationUtils().cell_state_4d_to_2d_batch(self.valid_moves())
+
+    def game_ended(self):
+        """float array of size (N, ), getGameEnded() of each game"""
+        SMALL_VALUE = 1e-1
+        return np.where(np.isnan(self.board), SMALL_VALUE, self.board)
+
+    def boards(self):
+        """int8 array of size (N, 9, 9), the boards as used by ImplementedGame"""
+        return ImplementationUtils().cell_state_4d_to_2d_batch(self.cells)
+
+    def curr_areas(self):
+        """list of N curr_area, (x, y) or None as used by ImplementedGame"""
+        return [None if curr_area == -1 else (curr_area // 3, curr_area % 3)
+                for curr_area in self.curr_area.tolist()]
+
+    def canonical(self):
+        """
+        Returns:
+            canonicalBoards: int8 array of size (N, 9, 9), getCanonicalForm() of each game
+            curr_areas: list of N curr_area
+        """
+        return self.boards() * self.curr_player.astype(np.int8)[:, None, None], self.curr_areas()
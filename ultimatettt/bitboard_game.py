@@ -0,0 +1,224 @@
+import numpy as np
+
+from original_game import LogicUtils, OriginalGame, AREA_FULL
+from exceptions import (
+    BoardWonException, AreaWonException,
+    AreaWrongException, CellPlayedException)
+
+
+"""
+Bit layout:
+    cell k (the same k as an action, see LogicUtils.k_to_xyij) is bit k of an
+    81-bit int, so area a = 3*x + y occupies bits 9*a .. 9*a + 8, and
+    index_in_area = 3*i + j is the bit inside these 9 bits.
+    area statuses are 9-bit ints, bit a for area a.
+"""
+CELLS_FULL = (1 << 81) - 1
+# OPEN_AREAS_TO_CELLS[areas] -- 81-bit mask of all cells of a set of areas
+OPEN_AREAS_TO_CELLS = tuple(
+    sum(AREA_FULL << (9*a) for a in range(9) if areas >> a & 1)
+    for areas in range(1 << 9)
+)
+
+
+class BitboardUtils():
+    def __init__(self):
+        pass
+
+    def area_bits(self, cells:int, area:int) -> int:
+        """9 bits of an area from an 81-bit int"""
+        return (cells >> (9*area)) & AREA_FULL
+
+    def bits_to_1d(self, cells:int) -> np.ndarray:
+        """81-bit int to a binary array of size (81, ), indexed by k"""
+        return np.unpackbits(
+            np.frombuffer(cells.to_bytes(11, 'little'), dtype=np.uint8),
+            bitorder='little')[:81]
+
+    def array_1d_to_bits(self, array_1d:np.ndarray) -> int:
+        """the reverse operation of bits_to_1d(), any non-zero entry is a set bit"""
+        return int.from_bytes(
+            np.packbits(np.asarray(array_1d) != 0, bitorder='little').tobytes(), 'little')
+
+
+class BitboardGame():
+    """
+    Same rules and (mostly) the same interface as OriginalGame, but a position is
+    kept as bit masks, and a move only updates the played area and the board.
+    """
+
+    def __init__(self):
+        """
+        x_cells, o_cells: 81-bit ints, cells played by X (player 1) and O (player 2)
+        x_areas, o_areas, draw_areas: 9-bit ints, areas won by X, won by O, or drawn
+
+        board entries:
+            0: not determined
+            nan: draw
+            1: X (player 1) won
+            -1: O (player 2) won
+        """
+        self.x_cells = 0
+        self.o_cells = 0
+        self.x_areas = 0
+        self.o_areas = 0
+        self.draw_areas = 0
+        self.board = 0
+
+        self.curr_area = None
+        self.curr_player = 1
+
+    def __str__(self):
+        # cell_state, area, board, curr_player and curr_area are all there
+        return OriginalGame.__str__(self)
+
+    @property
+    def cell_state(self):
+        """int8 array of size (3, 3, 3, 3), as OriginalGame.cell_state"""
+        bit_utils = BitboardUtils()
+        cell_state = bit_utils.bits_to_1d(self.x_cells).astype(np.int8) \
+            - bit_utils.bits_to_1d(self.o_cells).astype(np.int8)
+        return cell_state.reshape((3, 3, 3, 3))
+
+    @property
+    def area(self):
+        """float array of size (3, 3), as OriginalGame.area"""
+        bit_utils = BitboardUtils()
+        area = bit_utils.bits_to_1d(self.x_areas)[:9].astype(float) \
+            - bit_utils.bits_to_1d(self.o_areas)[:9]
+        area[bit_utils.bits_to_1d(self.draw_areas)[:9] == 1] = np.nan
+        return area.reshape((3, 3))
+
+    def decided_areas(self):
+        return self.x_areas | self.o_areas | self.draw_areas
+
+    def update_area(self, area):
+        """
+        Change self.x_areas, self.o_areas or self.draw_areas of one area
+        """
+        bit_utils = BitboardUtils()
+        winner = LogicUtils().check_win_bits(
+            bit_utils.area_bits(self.x_cells, area), bit_utils.area_bits(self.o_cells, area))
+        if winner == 1:
+            self.x_areas |= 1 << area
+        elif winner == -1:
+            self.o_areas |= 1 << area
+        elif winner != 0:
+            self.draw_areas |= 1 << area
+
+    def update_board(self):
+        self.board = LogicUtils().check_win_bits(
+            self.x_areas, self.o_areas, self.decided_areas())
+
+    def update_all_areas_and_board(self):
+        self.x_areas = self.o_areas = self.draw_areas = 0
+        for area in range(9):
+            self.update_area(area)
+        self.update_board()
+
+    def check_playable_cell(self, k):
+        """raise a corresponding exception if not playable,
+        the same exceptions as OriginalGame.check_playable_cell()"""
+        k = int(k)  # a numpy int would overflow in the bit shifts
+        xyij = LogicUtils().k_to_xyij(k)
+        x, y, i, j = xyij
+        area = k // 9
+
+        if not (self.board == 0):
+            raise BoardWonException(self.board)
+
+        if self.decided_areas() >> area & 1:
+            raise AreaWonException((x, y), self.area[x, y])
+
+        if self.curr_area is not None and self.curr_area != (x, y):
+            raise AreaWrongException(self.curr_area, (x, y))
+
+        if (self.x_cells | self.o_cells) >> k & 1:
+            raise CellPlayedException(xyij, 1 if self.x_cells >> k & 1 else -1)
+
+    def execute_move(self, k):
+        """k is the 1 dimensional index of a cell, see LogicUtils.k_to_xyij()"""
+        k = int(k)  # a numpy int would overflow in the bit shifts
+        self.check_playable_cell(k)
+
+        if self.curr_player == 1:
+            self.x_cells |= 1 << k
+        else:
+            self.o_cells |= 1 << k
+        self.update_area(k // 9)
+        self.update_board()
+        self.curr_player = -self.curr_player
+
+        next_area = k % 9
+        if self.decided_areas() >> next_area & 1:
+            self.curr_area = None
+        else:
+            self.curr_area = (next_area // 3, next_area % 3)
+
+    def get_valid_moves_bits(self):
+        """81-bit int of playable cells"""
+        if self.board != 0:
+            return 0
+        playable_areas = ~self.decided_areas() & AREA_FULL
+        if self.curr_area is not None:
+            x, y = self.curr_area
+            playable_areas &= 1 << (3*x + y)
+        empty_cells = ~(self.x_cells | self.o_cells) & CELLS_FULL
+        return empty_cells & OPEN_AREAS_TO_CELLS[playable_areas]
+
+    def copy(self):
+        """a new BitboardGame of the same position"""
+        bitboard_game = BitboardGame()
+        bitboard_game.x_cells, bitboard_game.o_cells = self.x_cells, self.o_cells
+        bitboard_game.x_areas, bitboard_game.o_areas = self.x_areas, self.o_areas
+        bitboard_game.draw_areas = self.draw_areas
+        bitboard_game.board = self.board
+        bitboard_game.curr_area = self.curr_area
+        bitboard_game.curr_player = self.curr_player
+        return bitboard_game
+
+    def get_flipped(self):
+        """a copy with X and O swapped, used for canonical forms"""
+        bitboard_game = self.copy()
+        bitboard_game.x_cells, bitboard_game.o_cells = self.o_cells, self.x_cells
+        bitboard_game.x_areas, bitboard_game.o_areas = self.o_areas, self.x_areas
+        bitboard_game.board = -self.board
+        bitboard_game.curr_player = -self.curr_player
+        return bitboard_game
+
+    def get_valid_moves(self):
+        """return a 4d array of the current position"""
+        binary_1d_array = BitboardUtils().bits_to_1d(self.get_valid_moves_bits())
+        return binary_1d_array.astype(np.int8).reshape((3, 3, 3, 3))
+
+    def get_game_ended(self):
+        """as OriginalGame.get_game_ended()"""
+        SMALL_VALUE = 1e-1
+        if np.isnan(self.board):
+            return SMALL_VALUE
+        return self.board
+
+    def _reinit(self, cell_state, player, curr_area):
+        """cell_state is an array of size (3, 3, 3, 3) (or anything reshapable to (81, ))"""
+        cell_state_1d = np.asarray(cell_state).reshape(81)
+        self.x_cells = BitboardUtils().array_1d_to_bits(cell_state_1d == 1)
+        self.o_cells = BitboardUtils().array_1d_to_bits(cell_state_1d == -1)
+        self.update_all_areas_and_board()
+        self.curr_player = player
+        self.curr_area = curr_area
+        return self
+
+    def _get_next_self(self, cell_state, player, xyij, curr_area):
+        self._reinit(cell_state, player, curr_area)
+        self.execute_move(LogicUtils().xyij_to_k(xyij))
+        return self
+
+    def _get_valid_moves(self, cell_state, player, curr_area):
+        """return a 4d array, as OriginalGame._get_valid_moves()"""
+        self._reinit(cell_state, player, curr_area)
+        return self.get_valid_moves()
+
+    def _get_game_ended(self, cell_state, player, curr_area):
+        """as OriginalGame._get_game_ended()"""
+        self._reinit(cell_state, player, curr_area)
+        return self.get_game_ended()
@@ -0,0 +1,131 @@
+import logging
+import time
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# bounds of the values in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+PRIOR_PLIES = 2  # the moves are ordered by the network prior this many plies from the root
+TABLE_SIZE_FACTOR = 8  # the table is cleared when it has more than TABLE_SIZE_FACTOR * max_nodes entries
+
+
+class SolverBudgetExceeded(Exception):
+    pass
+
+
+class EndgameSolver():
+    """
+    An exact alpha-beta solver of endgames, over GameStates of canonical
+    boards. The values are those of the player to move: 1 won, 0 drawn, -1
+    lost with perfect play.
+
+    The states already solved are kept in a transposition table (by
+    state.key, as a value and its bound) shared by all the solve() calls, and
+    the moves are tried in the order: the best move of the table first, then
+    the network prior near the root, then the natural order.
+
+    Only endgames with at most args.endgameCells open cells (empty cells of the
+    undecided areas, that is an upper bound on the number of moves left) are
+    solved, and solve() gives up after args.endgameMaxNodes states.
+
+    When a board is solved, MCTS.getActionProb() returns a uniform policy over
+    the moves that keep the value, so these are also the self-play policy
+    targets of Coach on solved boards, instead of the visit counts.
+    """
+
+    def __init__(self, game, nnet, args):
+        self.game = game
+        self.nnet = nnet
+        self.args = args
+        self.table = {}  # state.key -> (value, bound, best move)
+        self.num_nodes = 0  # states searched by the current solve()
+        self.last_solve = {}  # result, states and seconds of the last solve()
+
+    def solve(self, state):
+        """
+        Input:
+            state: GameState of a canonical board, not ended
+
+        Returns:
+            value: the exact value of state, or None if state has more than
+                   args.endgameCells open cells or the node budget ran out
+            moves: the moves of state (on its board) that keep value
+        """
+        max_cells = self.args.get('endgameCells', None)
+        if max_cells is None or self.game.getPositionOpenCells(state.position) > max_cells:
+            return None, []
+
+        max_nodes = self.args.get('endgameMaxNodes', 50000)
+        if len(self.table) > TABLE_SIZE_FACTOR * max_nodes:
+            self.table.clear()
+        start = time.time()
+        self.num_nodes = 0
+        try:
+            values = {}
+            for move in self.orderMoves(state, 0):
+                child = self.game.getCanonicalGameState(self.game.getNextGameState(state, move))
+                values[move] = -self.alphaBeta(child, -1, 1, 1, max_nodes)
+        except SolverBudgetExceeded:
+            value, moves = None, []
+        else:
+            value = max(values.values())
+            moves = [move for move, move_value in values.items() if move_value == value]
+
+        self.last_solve = {'value': value, 'nodes': self.num_nodes, 'seconds': time.time() - start}
+        log.debug(f'Endgame solver: {self.last_solve}')
+        return value, moves
+
+    def alphaBeta(self, state, alpha, beta, ply, max_nodes):
+        """
+        Returns:
+            value: the value of state if it is in (alpha, beta), else a bound
+                   on it (<= alpha or >= beta)
+        """
+        if state.game_ended != 0:
+            return int(state.game_ended) if abs(state.game_ended) == 1 else 0  # 0.1 is a draw
+
+        self.num_nodes += 1
+        if self.num_nodes > max_nodes:
+            raise SolverBudgetExceeded()
+
+        best_move = None
+        entry = self.table.get(state.key)
+        if entry is not None:
+            value, bound, best_move = entry
+            if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+                return value
+
+        original_alpha = alpha
+        best_value = -2
+        for move in self.orderMoves(state, ply, best_move):
+            child = self.game.getCanonicalGameState(self.game.getNextGameState(state, move))
+            value = -self.alphaBeta(child, -beta, -alpha, ply + 1, max_nodes)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[state.key] = (best_value, bound, best_move)
+        return best_value
+
+    def orderMoves(self, state, ply, first_move=None):
+        """the valid moves of state, first_move first, then by network prior if ply < PRIOR_PLIES"""
+        moves = np.flatnonzero(state.valid_moves)
+        if ply < PRIOR_PLIES and len(moves) > 1:
+            prior, _ = self.nnet.predict(state.board, state.mask_2d)
+            moves = moves[np.argsort(-np.asarray(prior)[moves], kind='stable')]
+        moves = moves.tolist()
+        if first_move is not None:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
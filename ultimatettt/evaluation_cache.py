@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+
+class EvaluationCache():
+    """
+    An LRU cache of the network evaluations (pi, v), kept by NNetWrapper
+    across searches, self-play episodes and arena games. The keys are
+    (model version, board, mask), see NNetWrapper.getCacheKey(): the version
+    changes with the weights, so entries of old weights are never returned,
+    and clear() drops them.
+
+    The cached arrays are read-only, as the ones of GameState.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns:
+            prediction: the cached (pi, v) of key, None if it is not cached
+        """
+        prediction = self.entries.get(key)
+        if prediction is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return prediction
+
+    def put(self, key, pi, v):
+        """
+        Returns:
+            prediction: (pi, v) as cached, read-only
+        """
+        pi.setflags(write=False)
+        v.setflags(write=False)
+        self.entries[key] = (pi, v)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return pi, v
+
+    def clear(self):
+        self.entries.clear()
+
+    def getStats(self):
+        """
+        Returns:
+            stats: dict of the size of the cache, its hits, misses and hit rate
+                   since it was made
+        """
+        lookups = self.hits + self.misses
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0}
@@ -6,9 +6,11 @@ import numpy as np
 from original_game import LogicUtils, OriginalGame
 from implemented_Game import ImplementationUtils, ImplementedGame
 from implemented_NeuralNet import NNetWrapper
-from MCTS import MCTS
+from ArrayMCTS import createMCTS
+from ponderer import Ponderer
 from exceptions import GameException
 from main import args
+from utils import dotdict
 
 
 MODEL_FOLDER = 'model ver22'
@@ -171,16 +173,32 @@ class GraphicInterface():
             self.window['textException'].update(DEFAULT_TEXT_EXCEPTION)
             
 
+    def start_pondering(self, ponderer, game):
+        """if it is the turn of the human against the AI, search their position in the background until the next event"""
+        human_player = {'Human vs AI': 1, 'AI vs Human': -1}.get(self.mode)
+        if ponderer is None or human_player is None or self.original_game.curr_player != human_player:
+            return
+        state = ImplementationUtils().cell_state_4d_to_2d(self.original_game.cell_state)
+        if game.getGameEnded(state, human_player, self.original_game.curr_area) == 0:
+            ponderer.start(*game.getCanonicalForm(state, human_player, self.original_game.curr_area))
+
     def event_loop(self):
         # for AI only
         game = ImplementedGame()
         net = NNetWrapper(game)
         net.load_checkpoint(MODEL_FOLDER, MODEL_FILENAME)
-        mtcs = MCTS(game=game, nnet=net, args=args)
+        # with pondering, the visits made while the human thinks count for the AI move
+        mtcs = createMCTS(game=game, nnet=net, args=dotdict({**args, 'countRootVisits': args.ponder}))
+        ponderer = Ponderer(mtcs) if args.ponder else None
         human_valid_move = True
 
         while True:
+            # pondering runs while the window waits for an event, so the whole turn of the human is pondered,
+            # whatever the events (invalid moves, menus) that interrupt it
+            self.start_pondering(ponderer, game)
             event, values = self.window.read()
+            if ponderer is not None:
+                ponderer.stop()
 
             if event == sg.WIN_CLOSED or event == 'Exit':
                 self.window.close()
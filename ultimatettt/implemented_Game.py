@@ -1,17 +1,80 @@
 from Game import Game
 from original_game import LogicUtils, OriginalGame
+from bitboard_game import BitboardGame
+from zobrist import ZobristUtils
 
 import numpy as np
 
 
+"""
+Index tables of the layout conversions, computed once:
+    K_OF_2D[m*9 + n] -- k of the cell (m, n), see LogicUtils.k_to_xyij()
+    MN_OF_K[k] -- m*9 + n of the cell k
+k is also the flat index of (x, y, i, j) in a (3, 3, 3, 3) array,
+so 4d <-> 1d conversions are reshapes.
+"""
+K_OF_2D = np.array([
+    LogicUtils().xyij_to_k(LogicUtils().mn_to_xyij((m, n))) for m in range(9) for n in range(9)])
+MN_OF_K = np.argsort(K_OF_2D)
+
+
+def build_symmetry_tables():
+    """
+    Return:
+        SYMMETRIES_K -- int array of size (64, 81), array_1d[SYMMETRIES_K[t]] is the
+                        t-th symmetrical form of an array indexed by k (pi, valid moves)
+        SYMMETRIES_2D -- int array of size (64, 81), the same for flattened 2d boards
+        SYMMETRIES_AREA -- int array of size (64, 9), SYMMETRIES_AREA[t, 3*x + y] is
+                           3*x + y of the area (x, y) in the t-th symmetrical form
+
+    Explain:
+        the flips and rotations of the whole board (big) and of all areas (small),
+        2 x 2 x 4 x 4 = 64 forms, the curr_area only follows the big ones
+    """
+    symmetries_k, symmetries_area = list(), list()
+
+    for flip_big in [False, True]:
+        for flip_small in [False, True]:
+            for k_big in range(4):
+                for k_small in range(4):
+                    cell_state = np.arange(81).reshape(3, 3, 3, 3)
+                    area = np.arange(9).reshape(3, 3)
+
+                    if flip_big:
+                        cell_state = np.flip(cell_state, axis=0)
+                        area = np.flip(area, axis=0)
+                    if flip_small:
+                        cell_state = np.flip(cell_state, axis=2)
+
+                    cell_state = np.rot90(cell_state, k=k_big, axes=(0, 1))
+                    cell_state = np.rot90(cell_state, k=k_small, axes=(2, 3))
+                    area = np.rot90(area, k=k_big, axes=(0, 1))
+
+                    symmetries_k.append(cell_state.reshape(81))
+                    symmetries_area.append(np.argsort(area.reshape(9)))
+
+    symmetries_k = np.array(symmetries_k)
+    symmetries_2d = MN_OF_K[symmetries_k[:, K_OF_2D]]
+    return symmetries_k, symmetries_2d, np.array(symmetries_area)
+
+
+SYMMETRIES_K, SYMMETRIES_2D, SYMMETRIES_AREA = build_symmetry_tables()
+# the 8 forms where the areas are flipped and rotated the same way as the whole
+# board, only these keep the rule "the cell (i, j) sends to the area (i, j)",
+# so only these map a position to an equivalent one (the other forms are still
+# fine for training examples)
+GAME_SYMMETRIES = np.array([
+    (flip * 2 + flip) * 16 + k * 4 + k for flip in range(2) for k in range(4)])
+
+
 class ImplementationUtils():
+    """the conversions keep the dtype of their input, boards and masks are int8"""
     def __init__(self):
         pass
 
     def cell_state_4d_to_2d(self, cell_state):
         """
-        this should be called as least as possible since it cost a quite amount of time,
-        and other ways of implementing this isn't as obvious and not that better to be worth it
+        a single gather with K_OF_2D
 
         Input:
             cell_state -- int array of size (3,3,3,3)
@@ -23,76 +86,160 @@ class ImplementationUtils():
             original_game.cell_state = np.arange(81).reshape((3,3,3,3))  # for testing only
             return ImplementationUtils().cell_state_to_2d(original_game.cell_state)
 
-            [[ 0.  1.  2.  9. 10. 11. 18. 19. 20.]
-            [ 3.  4.  5. 12. 13. 14. 21. 22. 23.]
-            [ 6.  7.  8. 15. 16. 17. 24. 25. 26.]
-            [27. 28. 29. 36. 37. 38. 45. 46. 47.]
-            [30. 31. 32. 39. 40. 41. 48. 49. 50.]
-            [33. 34. 35. 42. 43. 44. 51. 52. 53.]
-            [54. 55. 56. 63. 64. 65. 72. 73. 74.]
-            [57. 58. 59. 66. 67. 68. 75. 76. 77.]
-            [60. 61. 62. 69. 70. 71. 78. 79. 80.]]
+            [[ 0  1  2  9 10 11 18 19 20]
+            [ 3  4  5 12 13 14 21 22 23]
+            [ 6  7  8 15 16 17 24 25 26]
+            [27 28 29 36 37 38 45 46 47]
+            [30 31 32 39 40 41 48 49 50]
+            [33 34 35 42 43 44 51 52 53]
+            [54 55 56 63 64 65 72 73 74]
+            [57 58 59 66 67 68 75 76 77]
+            [60 61 62 69 70 71 78 79 80]]
         """
-        res = np.zeros((9, 9), dtype=float)
-        logic_utils = LogicUtils()
-
-        for x in range(3):
-            for y in range(3):
-                for i in range(3):
-                    for j in range(3):
-                        m, n = logic_utils.xyij_to_mn((x, y, i, j))
-                        res[m, n] = cell_state[x, y, i, j]
-
-        return res
+        return self.cell_state_4d_to_2d_batch(np.asarray(cell_state)[None])[0]
 
     def cell_state_2d_to_4d(self, cell_state_2d):
         """the reverse operation of _4d_to_2d()"""
-        res = np.zeros((3,3,3,3), dtype=float)
-        logic_utils = LogicUtils()
-
-        for m in range(9):
-            for n in range(9):
-                x, y, i, j = logic_utils.mn_to_xyij((m, n))
-                res[x, y, i, j] = cell_state_2d[m, n]
-
-        return res
+        return self.cell_state_2d_to_4d_batch(np.asarray(cell_state_2d)[None])[0]
 
     def cell_state_4d_to_1d(self, cell_state):
-        res = np.zeros(81, dtype=float)
-        logic_utils = LogicUtils()
-
-        for x in range(3):
-            for y in range(3):
-                for i in range(3):
-                    for j in range(3):
-                        k = logic_utils.xyij_to_k((x, y, i, j))
-                        res[k] = cell_state[x, y, i, j]
-
-        return res
+        return self.cell_state_4d_to_1d_batch(np.asarray(cell_state)[None])[0]
 
     def cell_state_1d_to_4d(self, cell_state_1d):
-        res = np.zeros((3,3,3,3), dtype=float)
-        logic_utils = LogicUtils()
+        return self.cell_state_1d_to_4d_batch(np.asarray(cell_state_1d)[None])[0]
+
+    def cell_state_4d_to_2d_batch(self, cell_states):
+        """(N, 3, 3, 3, 3) -> (N, 9, 9)"""
+        cell_states = np.asarray(cell_states)
+        return cell_states.reshape(-1, 81)[:, K_OF_2D].reshape(-1, 9, 9)
+
+    def cell_state_2d_to_4d_batch(self, cell_states_2d):
+        """(N, 9, 9) -> (N, 3, 3, 3, 3)"""
+        cell_states_2d = np.asarray(cell_states_2d)
+        return cell_states_2d.reshape(-1, 81)[:, MN_OF_K].reshape(-1, 3, 3, 3, 3)
+
+    def cell_state_4d_to_1d_batch(self, cell_states):
+        """(N, 3, 3, 3, 3) -> (N, 81)"""
+        return np.array(cell_states).reshape(-1, 81)
+
+    def cell_state_1d_to_4d_batch(self, cell_states_1d):
+        """(N, 81) -> (N, 3, 3, 3, 3)"""
+        return np.array(cell_states_1d).reshape(-1, 3, 3, 3, 3)
+
+
+class GameState():
+    """
+    An immutable (board, player, curr_area) of an ImplementedGame, made by
+    ImplementedGame.getGameState(), getNextGameState() and getCanonicalGameState().
+
+    The derived fields (position, zobrist, key, valid_moves, mask_2d, game_ended, ...)
+    are computed on first access and memoized, so each of them is computed at
+    most once per state no matter how many callers ask. The board itself is
+    also derived from the position for states made by getNextGameState().
+    The arrays returned must not be changed in place.
+    """
+    __slots__ = ('game', 'player', 'curr_area', '_board', '_position', '_zobrist', '_key',
+                 '_symmetry_key', '_valid_moves', '_mask_2d', '_game_ended')
+
+    def __init__(self, game, board, player, curr_area, position=None, zobrist=None):
+        for name, value in [('game', game), ('player', player), ('curr_area', curr_area),
+                            ('_board', board), ('_position', position), ('_zobrist', zobrist),
+                            ('_key', None), ('_symmetry_key', None), ('_valid_moves', None),
+                            ('_mask_2d', None), ('_game_ended', None)]:
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'GameState is immutable, cannot set {name}')
+
+    def _memoize(self, name, value):
+        object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def board(self):
+        if self._board is None:
+            return self._memoize('_board', self.game.getPositionBoard(self._position))
+        return self._board
+
+    @property
+    def position(self):
+        """see ImplementedGame.getPosition()"""
+        if self._position is None:
+            return self._memoize('_position', self.game.getPosition(self._board, self.player, self.curr_area))
+        return self._position
+
+    @property
+    def zobrist(self):
+        """see ImplementedGame.getZobrist()"""
+        if self._zobrist is None:
+            return self._memoize('_zobrist', self.game.getZobrist(self.board))
+        return self._zobrist
+
+    @property
+    def key(self):
+        """ImplementedGame.getZobristKey() of the state"""
+        if self._key is None:
+            return self._memoize('_key', self.game.getZobristKey(self.zobrist, self.player, self.curr_area))
+        return self._key
+
+    @property
+    def symmetry_key(self):
+        """ImplementedGame.getSymmetryKey() of the state"""
+        if self._symmetry_key is None:
+            return self._memoize('_symmetry_key', self.game.getSymmetryKey(self.board, self.curr_area))
+        return self._symmetry_key
+
+    @property
+    def valid_moves(self):
+        """as ImplementedGame.getValidMoves()"""
+        if self._valid_moves is None:
+            self._valid_moves_and_mask()
+        return self._valid_moves
+
+    @property
+    def mask_2d(self):
+        """as ImplementedGame.get_mask_2d()"""
+        if self._mask_2d is None:
+            self._valid_moves_and_mask()
+        return self._mask_2d
+
+    def _valid_moves_and_mask(self):
+        valid_moves, mask_2d = self.game.getPositionValidMovesAndMask(self.position)
+        self._memoize('_valid_moves', valid_moves)
+        self._memoize('_mask_2d', mask_2d)
+
+    @property
+    def game_ended(self):
+        """as ImplementedGame.getGameEnded()"""
+        if self._game_ended is None:
+            return self._memoize('_game_ended', self.game.getPositionGameEnded(self.position))
+        return self._game_ended
+
+
+ENGINES = {
+    'original': OriginalGame,
+    'bitboard': BitboardGame,
+}
 
-        for k in range(81):
-            x, y, i, j = logic_utils.k_to_xyij(k)
-            res[x, y, i, j] = cell_state_1d[k]
-        
-        return res
 
 class ImplementedGame(Game):
     """a board must always go with curr_area"""
-    def __init__(self):
-        pass
+    def __init__(self, engine='original'):
+        """
+        engine: a key of ENGINES, the game logic backend,
+                'bitboard' gives the same results as 'original' but is faster
+        """
+        self.engine = ENGINES[engine]
 
     def getInitBoard(self):
         """
         Returns:
             startBoard: a representation of the board (ideally this is the form
-                        that will be the input to your neural network)
+                        that will be the input to your neural network),
+                        an int8 array of size (9, 9)
             curr_area
         """
-        original_game = OriginalGame()
+        original_game = self.engine()
 
         startBoard = ImplementationUtils().cell_state_4d_to_2d(original_game.cell_state)
         return startBoard, original_game.curr_area
@@ -117,7 +264,7 @@ class ImplementedGame(Game):
         """
         cell_state = ImplementationUtils().cell_state_2d_to_4d(board)
         xyij = LogicUtils().k_to_xyij(action)
-        original_game = OriginalGame()._get_next_self(cell_state, player, xyij, curr_area)
+        original_game = self.engine()._get_next_self(cell_state, player, xyij, curr_area)
 
         nextBoard = ImplementationUtils().cell_state_4d_to_2d(original_game.cell_state)
         return nextBoard, original_game.curr_player, original_game.curr_area
@@ -134,11 +281,25 @@ class ImplementedGame(Game):
                         moves that are valid from the current board and player,
                         0 for invalid moves
         """
+        validMoves, _ = self.getValidMovesAndMask(board, player, curr_area)
+        return validMoves
+
+    def getValidMovesAndMask(self, board, player, curr_area):
+        """
+        Returns:
+            validMoves: as getValidMoves()
+            mask: as get_mask_2d()
+            both from a single valid moves computation
+        """
         cell_state = ImplementationUtils().cell_state_2d_to_4d(board)
-        binary_4d_array = OriginalGame()._get_valid_moves(cell_state, player, curr_area)
+        binary_4d_array = self.engine()._get_valid_moves(cell_state, player, curr_area)
+        return self._valid_moves_and_mask(binary_4d_array)
 
-        validMoves = ImplementationUtils().cell_state_4d_to_1d(binary_4d_array)
-        return validMoves
+    def _valid_moves_and_mask(self, binary_4d_array):
+        # k of an action is the flat index of its cell in a (3, 3, 3, 3) array
+        validMoves = binary_4d_array.reshape(81)
+        mask = ImplementationUtils().cell_state_4d_to_2d(binary_4d_array)
+        return validMoves, mask
     
     def getGameEnded(self, board, player, curr_area):
         """
@@ -153,7 +314,7 @@ class ImplementedGame(Game):
         """
         cell_state = ImplementationUtils().cell_state_2d_to_4d(board)
 
-        r = OriginalGame()._get_game_ended(cell_state, player, curr_area)
+        r = self.engine()._get_game_ended(cell_state, player, curr_area)
         return r
     
     def getCanonicalForm(self, board, player, curr_area):
@@ -172,7 +333,7 @@ class ImplementedGame(Game):
                             the colors and return the board.
             curr_area
         """
-        return board * player, curr_area
+        return board * np.int8(player), curr_area
     
     def getSymmetries(self, board, pi, curr_area):
         """
@@ -185,88 +346,180 @@ class ImplementedGame(Game):
             symmForms: a list of [(board,pi, curr_area)] where each tuple is a symmetrical
                        form of the board and the corresponding pi vector. This
                        is used when training the neural network from examples.
+        """
+        boards, pis, curr_areas, _ = self.getSymmetriesBatch(board, pi, curr_area)
+        return list(zip(boards, pis, curr_areas))
 
-        TODO: improvements
+    def getSymmetriesBatch(self, board, pi, curr_area, mask_2d=None):
         """
-        cell_state_original = ImplementationUtils().cell_state_2d_to_4d(board)
-        pi_4d_original = ImplementationUtils().cell_state_1d_to_4d(pi)
-        if curr_area is not None:
-            curr_area_tracker_original = np.zeros((3,3))
-            curr_area_tracker_original[curr_area] = 1
-        
-        symmForms = list()
-
-        for flip_big in [False, True]:
-            for flip_small in [False, True]:
-                for k_big in range(4):
-                    for k_small in range(4):
-
-                        # init
-                        cell_state = cell_state_original.copy()
-                        pi_4d = pi_4d_original.copy()
-                        if curr_area is not None:
-                            curr_area_tracker = curr_area_tracker_original.copy()
-
-                        # flip big
-                        if flip_big:
-                            cell_state = np.flip(cell_state, axis=0)
-                            pi_4d = np.flip(pi_4d, axis=0)
-                            if curr_area is not None:
-                                curr_area_tracker = np.flip(curr_area_tracker, axis=0)
-                        
-                        # flip small
-                        if flip_small:
-                            cell_state = np.flip(cell_state, axis=2)
-                            pi_4d = np.flip(pi_4d, axis=2)
-                        
-                        # rotate
-                        cell_state = np.rot90(cell_state, k=k_big, axes=(0, 1))
-                        cell_state = np.rot90(cell_state, k=k_small, axes=(2, 3))
-
-                        pi_4d = np.rot90(pi_4d, k=k_big, axes=(0, 1))
-                        pi_4d = np.rot90(pi_4d, k=k_small, axes=(2, 3))
-
-                        if curr_area is not None:
-                            curr_area_tracker = np.rot90(curr_area_tracker, k=k_big, axes=(0, 1))
-                            
-                        # add result
-                        symmForms.append(
-                            (
-                                ImplementationUtils().cell_state_4d_to_2d(cell_state),  # board
-                                ImplementationUtils().cell_state_4d_to_1d(pi_4d),  # pi
-                                None if curr_area is None \
-                                    else tuple(np.argwhere(curr_area_tracker == 1).reshape(2))  # curr_area
-                            )
-                        )
-        
-        return symmForms
+        Input:
+            board: current board
+            pi: policy vector of size self.getActionSize()
+            curr_area
+            mask_2d: get_mask_2d() of board, computed if not given
+
+        Returns:
+            boards: (64, 9, 9) int8 array, the symmetrical forms of board, in the order of
+                    SYMMETRIES_K
+            pis: (64, 81) array, the corresponding pi vectors
+            curr_areas: list of the 64 corresponding curr_area
+            masks: (64, 9, 9) int8 array, get_mask_2d() of each symmetrical form
+        """
+        if mask_2d is None:
+            mask_2d = self.get_mask_2d(board, 1, curr_area)
+        boards = np.asarray(board, dtype=np.int8).reshape(81)[SYMMETRIES_2D].reshape(-1, 9, 9)
+        pis = np.asarray(pi, dtype=float)[SYMMETRIES_K]
+        masks = np.asarray(mask_2d, dtype=np.int8).reshape(81)[SYMMETRIES_2D].reshape(-1, 9, 9)
+        if curr_area is None:
+            curr_areas = [None] * len(SYMMETRIES_K)
+        else:
+            curr_areas = [(area // 3, area % 3)
+                          for area in SYMMETRIES_AREA[:, 3*curr_area[0] + curr_area[1]].tolist()]
+        return boards, pis, curr_areas, masks
 
     def stringRepresentation(self, board:np.ndarray, curr_area):
         """
         Input:
             board: current board
+            curr_area
 
         Returns:
-            boardString: a quick conversion of board to a string format.
+            boardString: a compact bytes key of board and curr_area, 82 bytes:
+                         the cells as int8, then 3*x + y of curr_area (9 for None).
                          Required by MCTS for hashing.
         """
-        try:
-            cell_state = ImplementationUtils().cell_state_2d_to_4d(board)
-            cell_state_1d = ImplementationUtils().cell_state_4d_to_1d(cell_state)
-            return str(cell_state_1d) + " " + str(curr_area)
-        except:
-            print(board)
+        area_code = 9 if curr_area is None else 3*curr_area[0] + curr_area[1]
+        return np.asarray(board, dtype=np.int8).tobytes() + bytes((area_code, ))
+
+    def getSymmetryKey(self, board, curr_area):
+        """
+        Returns:
+            key: the stringRepresentation() of the representative of board under
+                 GAME_SYMMETRIES (the smallest key), the same for all 8 forms
+            symmetry: int array of size (81, ), the permutation to the representative,
+                      validMoves[symmetry] is the valid moves of the representative
+                      and its action c is the action symmetry[c] of board
+        """
+        boards = np.asarray(board, dtype=np.int8).reshape(81)[SYMMETRIES_2D[GAME_SYMMETRIES]]
+        if curr_area is None:
+            area_codes = [9] * len(GAME_SYMMETRIES)
+        else:
+            area_codes = SYMMETRIES_AREA[GAME_SYMMETRIES, 3*curr_area[0] + curr_area[1]].tolist()
+        keys = [boards[t].tobytes() + bytes((area_codes[t], )) for t in range(len(GAME_SYMMETRIES))]
+        t = min(range(len(keys)), key=keys.__getitem__)
+        return keys[t], SYMMETRIES_K[GAME_SYMMETRIES[t]]
+
+    def getZobrist(self, board):
+        """
+        Returns:
+            zobrist: the Zobrist cells hashes of board (see zobrist.py), O(81),
+                     to be carried along with the board and updated by
+                     getNextZobrist() and getCanonicalZobrist() in O(1)
+        """
+        return ZobristUtils().get_zobrist(np.asarray(board).reshape(81)[MN_OF_K])
+
+    def getNextZobrist(self, zobrist, player, action):
+        """the zobrist of getNextState(board, player, action, curr_area)[0], O(1)"""
+        return ZobristUtils().get_next_zobrist(zobrist, player, action)
+
+    def getCanonicalZobrist(self, zobrist, player):
+        """the zobrist of getCanonicalForm(board, player, curr_area)[0], O(1)"""
+        return ZobristUtils().get_canonical_zobrist(zobrist, player)
+
+    def getZobristKey(self, zobrist, player, curr_area):
+        """
+        Returns:
+            key: a 64-bit int key of (board, player, curr_area), O(1).
+                 Used by MCTS for hashing instead of stringRepresentation().
+        """
+        return ZobristUtils().get_key(zobrist, player, curr_area)
 
     def get_mask_2d(self, board:np.ndarray, player, curr_area):
         '''simply a 2d array of valid moves'''
+        _, mask = self.getValidMovesAndMask(board, player, curr_area)
+        return mask
+
+    # Position API: a position is an engine object (OriginalGame or BitboardGame)
+    # which carries its area and board statuses, so stepping it with
+    # getNextPosition() only updates the played area and the board instead of
+    # rescanning all the areas like the board API above does on every call.
+
+    def getPosition(self, board, player, curr_area):
+        """the position of a board, areas and board statuses are computed once here"""
         cell_state = ImplementationUtils().cell_state_2d_to_4d(board)
-        binary_4d_array = OriginalGame()._get_valid_moves(cell_state, player, curr_area)
+        return self.engine()._reinit(cell_state, player, curr_area)
 
-        mask = ImplementationUtils().cell_state_4d_to_2d(binary_4d_array)
-        return mask
+    def getNextPosition(self, position, action):
+        """
+        Returns:
+            nextPosition: a new position after position.curr_player played action,
+                          position itself is not changed
+        """
+        next_position = position.copy()
+        next_position.execute_move(self._engine_move(action))
+        return next_position
+
+    def getCanonicalPosition(self, position):
+        """the position from the pov of position.curr_player, i.e. with curr_player == 1"""
+        if position.curr_player == 1:
+            return position
+        return position.get_flipped()
+
+    def getPositionBoard(self, position):
+        """the 2d board of a position, as used by getNextState() etc."""
+        return ImplementationUtils().cell_state_4d_to_2d(position.cell_state)
+
+    def getPositionValidMoves(self, position):
+        """as getValidMoves()"""
+        return position.get_valid_moves().reshape(81)
+
+    def getPositionMask2d(self, position):
+        """as get_mask_2d()"""
+        return ImplementationUtils().cell_state_4d_to_2d(position.get_valid_moves())
+
+    def getPositionValidMovesAndMask(self, position):
+        """as getValidMovesAndMask()"""
+        return self._valid_moves_and_mask(position.get_valid_moves())
+
+    def getPositionGameEnded(self, position):
+        """as getGameEnded()"""
+        return position.get_game_ended()
+
+    def getPositionOpenCells(self, position):
+        """the number of empty cells of the undecided areas, an upper bound on the number of moves left"""
+        any_area = position.copy()
+        any_area.curr_area = None
+        return int(any_area.get_valid_moves().sum())
+
+    # GameState API, see GameState
+
+    def getGameState(self, board, player, curr_area):
+        return GameState(self, board, player, curr_area)
+
+    def getNextGameState(self, state, action):
+        """the GameState after state.player played action, its position and zobrist
+        are stepped from the ones of state instead of being computed from scratch"""
+        next_position = self.getNextPosition(state.position, action)
+        next_zobrist = self.getNextZobrist(state.zobrist, state.player, action)
+        return GameState(self, None, next_position.curr_player, next_position.curr_area,
+                         next_position, next_zobrist)
+
+    def getCanonicalGameState(self, state):
+        """the GameState of getCanonicalForm(state.board, state.player, state.curr_area)"""
+        if state.player == 1:
+            return state
+        return GameState(self, None, 1, state.curr_area,
+                         self.getCanonicalPosition(state.position),
+                         self.getCanonicalZobrist(state.zobrist, state.player))
+
+    def _engine_move(self, action):
+        """OriginalGame.execute_move() takes xyij, BitboardGame.execute_move() takes k"""
+        if self.engine is BitboardGame:
+            return action
+        return LogicUtils().k_to_xyij(action)
     
 
 if __name__ == '__main__':
     igame = ImplementedGame()
-    next_board, next_player, next_curr_area = igame.getNextState(np.zeros((9, 9)), 1, 21, None)
+    next_board, next_player, next_curr_area = igame.getNextState(np.zeros((9, 9), dtype=np.int8), 1, 21, None)
     print(igame.get_mask_2d(next_board, next_player, next_curr_area))
\ No newline at end of file
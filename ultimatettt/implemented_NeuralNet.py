@@ -10,6 +10,7 @@ import numpy as np
 
 from utils import *
 from NeuralNet import NeuralNet
+from evaluation_cache import EvaluationCache
 from UTTTNet import UTTTNet as Unnet
 
 args = dotdict({
@@ -21,6 +22,7 @@ args = dotdict({
     'cuda': torch.cuda.is_available(),
     # 'num_channels': 512,
     'num_channels': 64,
+    'eval_cache_size': 50000,  # evaluations kept in the LRU cache of predict(), 0 for no cache
     })
 
 class NNetWrapper(NeuralNet):
@@ -28,6 +30,8 @@ class NNetWrapper(NeuralNet):
         self.nnet = Unnet(game, args)
         self.board_x, self.board_y = game.getBoardSize()
         self.action_size = game.getActionSize()
+        self.version = 0  # changes with the weights, see weightsChanged()
+        self.cache = EvaluationCache(args.eval_cache_size) if args.eval_cache_size else None
 
         if args.cuda:
             self.nnet.cuda()
@@ -36,6 +40,7 @@ class NNetWrapper(NeuralNet):
         """
         examples: list of examples, each example is of form (board, pi, v) (+ curr_area) (+ mask_2d)
         """
+        self.weightsChanged()
         optimizer = optim.Adam(self.nnet.parameters())
 
         for epoch in range(args.epochs):
@@ -53,10 +58,11 @@ class NNetWrapper(NeuralNet):
             for batch_no in range(batch_count):
                 sample_ids = np.random.randint(len(examples), size=args.batch_size)
                 boards, pis, vs, curr_areas, mask_2ds = list(zip(*[examples[i] for i in sample_ids]))
-                boards = torch.FloatTensor(np.array(boards).astype(np.float64))
+                # boards and masks are kept as int8, float32 only from here
+                boards = torch.from_numpy(np.array(boards, dtype=np.float32))
                 target_pis = torch.FloatTensor(np.array(pis))
                 target_vs = torch.FloatTensor(np.array(vs).astype(np.float64))
-                mask_2ds = torch.FloatTensor(np.array(mask_2ds).astype(np.float64))
+                mask_2ds = torch.from_numpy(np.array(mask_2ds, dtype=np.float32))
                 # target_curr_areas = torch.FloatTensor(np.array(curr_areas).astype(np.float64))
 
                 # predict
@@ -85,16 +91,36 @@ class NNetWrapper(NeuralNet):
                 total_loss.backward()
                 optimizer.step()
 
+    def weightsChanged(self):
+        """called when the weights change (train, load_checkpoint), the cached evaluations are dropped"""
+        self.version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def getCacheKey(self, board, mask_2d):
+        """the key of a position in the evaluation cache, for the current weights"""
+        return self.version, np.asarray(board, dtype=np.int8).tobytes(), np.asarray(mask_2d, dtype=np.int8).tobytes()
+
     def predict(self, board, mask_2d):
         """
-        board: np array with board
+        board: np array with board (int8)
+        mask_2d: np array of valid moves (int8)
+
+        the evaluations are cached (args.eval_cache_size), the arrays returned
+        must not be changed in place
         """
+        if self.cache is not None:
+            key = self.getCacheKey(board, mask_2d)
+            prediction = self.cache.get(key)
+            if prediction is not None:
+                return prediction
+
         # timing
         start = time.time()
 
         # preparing input
-        board = torch.FloatTensor(board.astype(np.float64))
-        mask_2d = torch.FloatTensor(mask_2d.astype(np.float64))
+        board = torch.from_numpy(np.asarray(board, dtype=np.float32))
+        mask_2d = torch.from_numpy(np.asarray(mask_2d, dtype=np.float32))
         if args.cuda:
             board = board.contiguous().cuda()
             mask_2d = mask_2d.contiguous().cuda()
@@ -104,7 +130,42 @@ class NNetWrapper(NeuralNet):
             pi, v = self.nnet(torch.cat((board, mask_2d.view(1, self.board_x, self.board_y)), 0))
 
         # print('PREDICTION TIME TAKEN : {0:03f}'.format(time.time()-start))
-        return torch.exp(pi).data.cpu().numpy()[0], v.data.cpu().numpy()[0]
+        pi, v = torch.exp(pi).data.cpu().numpy()[0], v.data.cpu().numpy()[0]
+        if self.cache is not None:
+            return self.cache.put(key, pi, v)
+        return pi, v
+
+    def predictBatch(self, boards, mask_2ds):
+        """
+        boards: np array of K boards (int8)
+        mask_2ds: np array of the K valid moves masks (int8)
+
+        the K pi and v of predict() in a single forward pass, for the boards
+        that are not in the evaluation cache
+        """
+        if self.cache is None:
+            return self._forwardBatch(boards, mask_2ds)
+
+        keys = [self.getCacheKey(board, mask_2d) for board, mask_2d in zip(boards, mask_2ds)]
+        predictions = [self.cache.get(key) for key in keys]
+        misses = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if misses:
+            pis, vs = self._forwardBatch([boards[i] for i in misses], [mask_2ds[i] for i in misses])
+            for i, pi, v in zip(misses, pis, vs):
+                predictions[i] = self.cache.put(keys[i], pi, v)
+        return np.array([pi for pi, _ in predictions]), np.array([v for _, v in predictions])
+
+    def _forwardBatch(self, boards, mask_2ds):
+        boards = torch.from_numpy(np.asarray(boards, dtype=np.float32))
+        mask_2ds = torch.from_numpy(np.asarray(mask_2ds, dtype=np.float32))
+        if args.cuda:
+            boards = boards.contiguous().cuda()
+            mask_2ds = mask_2ds.contiguous().cuda()
+        self.nnet.eval()
+        with torch.no_grad():
+            pi, v = self.nnet(torch.stack((boards, mask_2ds), 1))
+
+        return torch.exp(pi).data.cpu().numpy(), v.data.cpu().numpy()
 
     def loss_pi(self, targets, outputs):
         return -torch.sum(targets * outputs) / targets.size()[0]
@@ -131,3 +192,4 @@ class NNetWrapper(NeuralNet):
         map_location = None if args.cuda else 'cpu'
         checkpoint = torch.load(filepath, map_location=map_location)
         self.nnet.load_state_dict(checkpoint['state_dict'])
+        self.weightsChanged()
@@ -0,0 +1,70 @@
+import queue
+import threading
+
+
+class InferenceQueue():
+    """
+    Shared by the worker threads of a parallel search: each worker submits
+    one board at a time with predict() and waits, a serving thread gathers
+    the pending boards and evaluates them with a single nnet.predictBatch().
+
+    A batch is sent as soon as max_batch_size boards are waiting (one per
+    worker), or when no other board arrived for max_wait seconds.
+    """
+
+    def __init__(self, nnet, max_batch_size, max_wait=1e-3):
+        self.nnet = nnet
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.thread = None
+
+        self.num_batches = 0
+        self.num_predictions = 0
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.requests.put(None)
+        self.thread.join()
+
+    def predict(self, board, mask_2d):
+        """as nnet.predict(), blocks until the batch of the board is evaluated"""
+        request = {'board': board, 'mask_2d': mask_2d, 'done': threading.Event()}
+        self.requests.put(request)
+        request['done'].wait()
+        if 'error' in request:
+            raise request['error']
+        return request['prediction']
+
+    def _serve(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)  # stop after this batch
+                    break
+                batch.append(request)
+
+            try:
+                pis, vs = self.nnet.predictBatch([request['board'] for request in batch],
+                                                 [request['mask_2d'] for request in batch])
+                for request, pi, v in zip(batch, pis, vs):
+                    request['prediction'] = (pi, v)
+            except Exception as e:
+                for request in batch:
+                    request['error'] = e
+            self.num_batches += 1
+            self.num_predictions += len(batch)
+            for request in batch:
+                request['done'].set()
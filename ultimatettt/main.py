@@ -27,9 +27,27 @@ args = dotdict({
     # 'numMCTSSims': 25,          # Number of games moves for MCTS to simulate.
     # 'numMCTSSims': 20,   
     'numMCTSSims': 15,
+    'moveTimeMs': None,         # Search each move for this time instead of numMCTSSims simulations (None for off).
+    'gameTimeMs': None,         # Time budget of a whole game, shared out between the moves (None for off).
+    'adaptiveSims': False,      # Less search on forced moves and moves in one area, more while the visits are unsettled.
+    'earlyStop': True,          # temp=0 searches (arena, GUI) stop once the most visited move cannot change.
+    'ponder': True,             # GUI only: the AI searches during the human turn, and these visits count for its move.
+    'ponderMaxVisits': 10000,   # GUI only: pondering stops at this many visits of the position, to bound the tree.
+    'numThreads': 1,            # ArrayMCTS only: worker threads searching the same tree, with a shared inference queue.
+    'leafBatchSize': 1,         # ArrayMCTS only: leaves evaluated together in one forward pass (virtual loss), 1 for none.
     # 'arenaCompare': 40,         # Number of games to play during arena play to determine if new net will be accepted.
     'arenaCompare': 24,
     'cpuct': 1,
+    'zobristDebug': False,      # MCTS checks its Zobrist keys against full board keys (slow, for tests).
+    'symmetryKeys': False,      # MCTS shares nodes between positions that are rotations/reflections of each other.
+    'arrayTree': False,         # Use ArrayMCTS, the MCTS tree kept in numpy arrays instead of dicts.
+    'mctsSolver': False,        # MCTS proves won/lost/drawn boards, stops searching them and plays the proven moves.
+    'endgameCells': None,       # Play endgames with at most this many empty cells left by an exact alpha-beta solver (None for off).
+                                # Slower than the numMCTSSims search near 12 cells, and the self-play targets of solved
+                                # boards become uniform over the moves that keep the result instead of the visit counts.
+    'endgameMaxNodes': 50000,   # Node budget of the endgame solver per move, MCTS plays the move if it runs out.
+    'maxNodes': None,           # Node budget of the MCTS tree, the least recently visited nodes are evicted (None for no limit).
+    'reuseSubtree': False,      # ArrayMCTS only: keep the subtree of the new root between moves, release the rest.
 
     'checkpoint': './temp/',
     'load_model': True,
@@ -1,12 +1,59 @@
+import logging
+import time
 from typing import List
 
 import numpy as np
 
 from exceptions import (
-    GameException,
     BoardWonException, AreaWonException,
     AreaWrongException, CellPlayedException)
 
+log = logging.getLogger(__name__)
+
+"""
+A 3x3 array (an area, or the areas of the board) is encoded as 9-bit ints,
+bit 3*i + j for the entry [i, j]
+"""
+AREA_FULL = 0x1FF
+# in the order LogicUtils().check_win_by_lines() checks them
+WIN_LINES = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+POWERS_OF_2 = 1 << np.arange(9)
+
+
+def build_check_win_table():
+    """
+    Return:
+        ndarray -- of size (512, 512), [x_bits, o_bits] is the result of
+                   LogicUtils().check_win() for an array with 1 on x_bits,
+                   -1 on o_bits and 0 elsewhere (nan if draw, see check_win)
+    """
+    bits = np.arange(1 << 9)
+    table = np.zeros((1 << 9, 1 << 9), dtype=float)
+    decided = np.zeros((1 << 9, 1 << 9), dtype=bool)
+
+    for line in WIN_LINES:
+        x_won = ((bits & line) == line)[:, None] & ~decided
+        table[x_won] = 1
+        decided |= x_won
+        o_won = ((bits & line) == line)[None, :] & ~decided
+        table[o_won] = -1
+        decided |= o_won
+
+    filled = (bits[:, None] | bits[None, :]) == AREA_FULL
+    table[filled & ~decided] = np.nan
+    return table
+
+
+_start = time.perf_counter()
+CHECK_WIN_TABLE = build_check_win_table()
+CHECK_WIN_TABLE_BUILD_TIME = time.perf_counter() - _start
+log.debug(f'CHECK_WIN_TABLE built in {CHECK_WIN_TABLE_BUILD_TIME * 1000:.1f} ms')
+
+
 class LogicUtils():
     def __init__(self):
         pass
@@ -92,6 +139,44 @@ class LogicUtils():
 
         Output:
             float -- return the winner (-1 or 1), nan if draw, 0 if not determined
+
+        Explain:
+            a lookup in CHECK_WIN_TABLE, same results as check_win_by_lines()
+        """
+        array = np.asarray(array).reshape(9)
+        winner = self.check_win_bits(
+            int(POWERS_OF_2 @ (array == 1)),
+            int(POWERS_OF_2 @ (array == -1)),
+            int(POWERS_OF_2 @ (array != 0)))
+        return winner
+
+    def check_win_bits(self, x_bits:int, o_bits:int, filled_bits:int=None) -> float:
+        """
+        Input:
+            x_bits, o_bits -- 9-bit ints of the entries equal to 1 and -1
+            filled_bits -- 9-bit int of the entries != 0, defaults to x_bits | o_bits,
+                           differs only if there are nan (drawn areas of the board)
+
+        Output:
+            float -- the same as check_win()
+        """
+        winner = CHECK_WIN_TABLE[x_bits, o_bits]
+        if winner == 0:
+            if filled_bits == AREA_FULL:
+                return np.nan
+            return 0
+        return float(winner)
+
+    def check_win_by_lines(self, array:np.ndarray) -> float:
+        """
+        Input:
+            array -- an array of size(3, 3), int/float entries in {-1, 0, 1, nan}
+
+        Output:
+            float -- return the winner (-1 or 1), nan if draw, 0 if not determined
+
+        Explain:
+            checks the lines one by one, used to build and test CHECK_WIN_TABLE
         """
         win_row_col = self.check_win_row_col(array)
         win_diagonal = self.check_win_diagonal(array)
@@ -166,7 +251,7 @@ class OriginalGame():
 
     def __init__(self):
         """
-        cell_state entries:
+        cell_state entries (int8):
             0: blank
             1: X (player 1) played
             -1: O (player 2) played
@@ -177,7 +262,7 @@ class OriginalGame():
             1: X (player 1) won
             -1: O (player 2) won
         """
-        self.cell_state = np.full((3, 3, 3, 3), 0, dtype=int)
+        self.cell_state = np.full((3, 3, 3, 3), 0, dtype=np.int8)
         self.area = np.full((3, 3), 0, dtype=float)
         self.board = 0
 
@@ -249,35 +334,43 @@ class OriginalGame():
             self.curr_area = None
     
 
-    def _reinit(self, cell_state, player, curr_area):
-        self.cell_state = cell_state
-        self.update_all_areas_and_board()
-        self.curr_player = player
-        self.curr_area = curr_area
-        return self
+    def copy(self):
+        """a new OriginalGame of the same position, area and board are copied, not recomputed"""
+        original_game = OriginalGame()
+        original_game.cell_state = self.cell_state.copy()
+        original_game.area = self.area.copy()
+        original_game.board = self.board
+        original_game.curr_area = self.curr_area
+        original_game.curr_player = self.curr_player
+        return original_game
+
+    def get_flipped(self):
+        """a copy with X and O swapped, used for canonical forms"""
+        original_game = self.copy()
+        original_game.cell_state = -original_game.cell_state
+        original_game.area = -original_game.area
+        original_game.board = -original_game.board
+        original_game.curr_player = -original_game.curr_player
+        return original_game
+
+    def get_valid_moves(self):
+        """
+        return a 4d binary array of the current position
 
-    def _get_next_self(self, cell_state, player, xyij, curr_area):
-        self._reinit(cell_state, player, curr_area)
-        self.execute_move(xyij)
-        return self
+        Explain:
+            the same cells as the ones check_playable_cell() does not raise for,
+            but derived directly from the board, areas and curr_area
+        """
+        if not (self.board == 0):
+            return np.zeros((3, 3, 3, 3), dtype=np.int8)
 
-    def _get_valid_moves(self, cell_state, player, curr_area):
-        """return a 4d array, 
-        TODO: may need an improvement"""
-        self._reinit(cell_state, player, curr_area)
-        binary_4d_array = np.zeros((3, 3, 3, 3))
-        for x in range(3):
-            for y in range(3):
-                for i in range(3):
-                    for j in range(3):
-                        try:
-                            self.check_playable_cell((x, y, i, j))
-                            binary_4d_array[x, y, i, j] = 1
-                        except GameException:
-                            pass
-        return binary_4d_array
+        playable_areas = self.area == 0
+        if self.curr_area is not None:
+            playable_areas = playable_areas & (np.arange(9).reshape(3, 3) == 3*self.curr_area[0] + self.curr_area[1])
 
-    def _get_game_ended(self, cell_state, player, curr_area):
+        return ((self.cell_state == 0) & playable_areas[:, :, None, None]).astype(np.int8)
+
+    def get_game_ended(self):
         SMALL_VALUE = 1e-1
         """
         Board:
@@ -290,10 +383,30 @@ class OriginalGame():
             r: 0 if game has not ended. 1 if player won, -1 if player lost,
                small non-zero value for draw.
         """
-        self._reinit(cell_state, player, curr_area)
         if np.isnan(self.board):
             return SMALL_VALUE
         return self.board
+
+    def _reinit(self, cell_state, player, curr_area):
+        self.cell_state = np.asarray(cell_state, dtype=np.int8)
+        self.update_all_areas_and_board()
+        self.curr_player = player
+        self.curr_area = curr_area
+        return self
+
+    def _get_next_self(self, cell_state, player, xyij, curr_area):
+        self._reinit(cell_state, player, curr_area)
+        self.execute_move(xyij)
+        return self
+
+    def _get_valid_moves(self, cell_state, player, curr_area):
+        """return a 4d array"""
+        self._reinit(cell_state, player, curr_area)
+        return self.get_valid_moves()
+
+    def _get_game_ended(self, cell_state, player, curr_area):
+        self._reinit(cell_state, player, curr_area)
+        return self.get_game_ended()
         
 
 def main():
@@ -0,0 +1,35 @@
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class Ponderer():
+    """
+    Runs MCTS.ponder() in a background thread while the opponent (the human in
+    the GUI) thinks, so the next getActionProb() starts from a grown tree.
+
+    The MCTS must not be used by another thread while pondering: call stop()
+    before getActionProb().
+    """
+
+    def __init__(self, mcts):
+        self.mcts = mcts
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self, canonicalBoard, curr_area):
+        """ponder the board of the opponent, as it is passed to getActionProb()"""
+        self.stop()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.mcts.ponder, args=(canonicalBoard, curr_area, self.stop_event),
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        log.debug(f'Pondered {self.mcts.last_ponder}')
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+"""
+Zobrist hashing of (board, player, curr_area), 64-bit keys:
+    key = XOR of ZOBRIST_CELLS[k, cell owner] over the played cells
+          ^ ZOBRIST_AREAS[3*x + y of curr_area, 9 for None]
+          ^ ZOBRIST_SIDE if player == -1
+
+A zobrist is the pair (cells hash of the board, cells hash of -board), so that
+playing a move and taking the canonical form (which negates the board) are
+both O(1), see ZobristUtils.
+"""
+_rng = np.random.default_rng(81)
+ZOBRIST_CELLS = _rng.integers(0, 2**64, size=(81, 2), dtype=np.uint64)  # [k, 0] X, [k, 1] O
+ZOBRIST_AREAS = [int(z) for z in _rng.integers(0, 2**64, size=10, dtype=np.uint64)]
+ZOBRIST_SIDE = int(_rng.integers(0, 2**64, dtype=np.uint64))
+_ZOBRIST_CELLS_INT = [(int(z_x), int(z_o)) for z_x, z_o in ZOBRIST_CELLS]
+
+
+class ZobristUtils():
+    def __init__(self):
+        pass
+
+    def get_zobrist(self, cell_state_1d:np.ndarray):
+        """
+        Input:
+            cell_state_1d -- array of size (81, ) indexed by k, entries in {-1, 0, 1}
+
+        Return:
+            (int, int) -- the cells hash of cell_state_1d and of -cell_state_1d, O(81)
+        """
+        cell_state_1d = np.asarray(cell_state_1d)
+        x_cells, o_cells = cell_state_1d == 1, cell_state_1d == -1
+        hash_plus = np.bitwise_xor.reduce(ZOBRIST_CELLS[x_cells, 0]) \
+            ^ np.bitwise_xor.reduce(ZOBRIST_CELLS[o_cells, 1])
+        hash_minus = np.bitwise_xor.reduce(ZOBRIST_CELLS[o_cells, 0]) \
+            ^ np.bitwise_xor.reduce(ZOBRIST_CELLS[x_cells, 1])
+        return int(hash_plus), int(hash_minus)
+
+    def get_next_zobrist(self, zobrist, player, k):
+        """the zobrist after player played the cell k, O(1)"""
+        hash_plus, hash_minus = zobrist
+        z_x, z_o = _ZOBRIST_CELLS_INT[k]
+        if player == 1:
+            return hash_plus ^ z_x, hash_minus ^ z_o
+        return hash_plus ^ z_o, hash_minus ^ z_x
+
+    def get_canonical_zobrist(self, zobrist, player):
+        """the zobrist of board * player, O(1)"""
+        if player == 1:
+            return zobrist
+        return zobrist[1], zobrist[0]
+
+    def get_key(self, zobrist, player, curr_area):
+        """the 64-bit key of (board, player, curr_area), O(1)"""
+        area_code = 9 if curr_area is None else 3*curr_area[0] + curr_area[1]
+        key = zobrist[0] ^ ZOBRIST_AREAS[area_code]
+        if player == -1:
+            key ^= ZOBRIST_SIDE
+        return key